@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
-from backend.User.service import extract_users
+from backend.User.service import resolve_scope_user_ids
 from backend.db.db import get_session
 from backend.Area.AreaModel import L1
 from backend.Area.AreaSchema import AreaCreate, AreaResponse, AreaSummary
-from backend.auth.jwt_handler import verify_token
+from backend.auth.principal import Principal, get_principal
 from backend.schemas.RoleSchema import RoleEnum
 from backend.auth.role_checker import check_role
 from backend.User.UserModel import User
@@ -19,11 +19,11 @@ router = APIRouter()
 def create_area(
     area: AreaCreate,
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
     db_area = L1(
         L1_name=area.area_name,
-        user_id=token.get("user_id"),
+        user_id=principal.user_id,
     )
 
     db.add(db_area)
@@ -44,25 +44,16 @@ def create_area(
 @check_role([RoleEnum.L1, RoleEnum.L2, RoleEnum.L3, RoleEnum.L4])
 def get_all_areas(
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
-    user_id = token.get("user_id")
-    role_str = token.get("role")
-
-    if not user_id or not role_str:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-
-    try:
-        user_role = RoleEnum(role_str)
-    except ValueError:
-        raise HTTPException(status_code=403, detail="Invalid user role")
+    user_id = principal.user_id
+    user_role = principal.role
 
     if user_role == RoleEnum.L1:
         area = db.query(L1.L1_id, L1.L1_name, User.name).join(User, L1.user_id == User.user_id).filter(L1.user_id == user_id).first()
         return [AreaSummary(area_id=area[0], area_name=area[1], asm_name=area[2])] if area else []
 
-    downline_users = extract_users(user_id, user_role, db)
-    downline_user_ids = [u.user_id for u in downline_users]
+    downline_user_ids = resolve_scope_user_ids(db, user_id, user_role)
     downline_user_ids.append(user_id)
 
     areas = (
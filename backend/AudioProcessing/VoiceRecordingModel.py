@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Text, DateTime, Float, func, Enum
+from sqlalchemy import Column, String, Text, DateTime, Date, Float, Integer, JSON, func, Enum, Index
 from sqlalchemy.orm import declarative_base, relationship
 from backend.schemas.StatusSchema import StatusEnum
 from backend.schemas.TranscriptionSchema import TransctriptionStatus
@@ -29,3 +29,28 @@ class VoiceRecording(Base):
     modified_at = Column(
         DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp()
     )
+
+    __table_args__ = (
+        Index("ix_voice_recording_user_id_created_at", "user_id", "created_at"),
+        Index("ix_voice_recording_user_id_start_time", "user_id", "start_time"),
+    )
+
+
+# per user/store/day totals of voice_recording, kept current on every write
+class RecordingDailyRollup(Base):
+    __tablename__ = "recording_daily_rollup"
+
+    user_id = Column(String(36), primary_key=True)
+    day = Column(Date, primary_key=True)  # DATE(created_at)
+    store_id = Column(String(36), primary_key=True)
+    recording_count = Column(Integer, nullable=False, default=0)
+    duration_sum = Column(Float, nullable=False, default=0)
+    listening_sum = Column(Float, nullable=False, default=0)
+    last_listening_time = Column(DateTime, nullable=True)
+    hourly_counts = Column(JSON, nullable=False)  # 24 counts by hour of start_time
+    transcription_count = Column(Integer, nullable=False, default=0)  # transcription rows of these recordings
+    modified_at = Column(
+        DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp()
+    )
+
+    __table_args__ = (Index("ix_recording_daily_rollup_day", "day"),)
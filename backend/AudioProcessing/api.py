@@ -1,17 +1,25 @@
 import io
 import datetime
-from fastapi import APIRouter, UploadFile,BackgroundTasks, File, Form, Query
+from fastapi import APIRouter, UploadFile,BackgroundTasks, File, Form, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from typing import List, Optional
-from sqlalchemy import func, cast, Date
 from datetime import date, datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import APIRouter, Depends, HTTPException
 from backend.State.stateModel import L3
-from backend.User.service import extract_users
-from backend.db.db import get_session
+from backend.User.service import resolve_scope_user_ids
+from backend.db.db import get_async_session, get_session
 from backend.AudioProcessing.schema import RecordingResponse, GetRecording, GetLastRecording
 from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording
-from backend.auth.jwt_handler import verify_token
+from backend.AudioProcessing.rollup import (
+    record_delete,
+    record_listening,
+    rollup_daily_duration,
+    rollup_filters,
+)
+from backend.auth.principal import Principal, get_principal
 from backend.config import TenantSettings
 from backend.sales.SalesModel import L2
 from backend.Area.AreaModel import L1
@@ -20,10 +28,13 @@ from backend.Store.StoreModel import L0
 from backend.AudioProcessing.schema import TransctriptionStatus
 from backend.User.UserModel import User
 from backend.AudioProcessing.service import (
-    extract_recordings,
+    TRANSCRIBE_MIN_CALL_DURATION,
+    recording_filters,
+    recording_insights,
+    recordings_page,
     upload_recording as upload_recording_service,
 )
-from backend.Transcription.service import transcribe_audio
+from backend.Transcription.worker import enqueue_transcription
 from backend.auth.role_checker import check_role
 from backend.Transcription.TranscriptionModel import Transcription
 # from pydub import AudioSegment
@@ -32,6 +43,9 @@ from backend.Transcription.TranscriptionModel import Transcription
 router = APIRouter()
 settings = TenantSettings()
 
+RECORDINGS_PAGE_SIZE = 200
+RECORDINGS_MAX_PAGE_SIZE = 1000
+
 
 @router.post("/upload-recording", response_model=RecordingResponse)
 def upload_recording(
@@ -43,14 +57,10 @@ def upload_recording(
     CallDuration: str = Form(None),
     store_id: str = Form(None),
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
-    user_id = token.get("user_id")
-    if not user_id:
-        raise HTTPException(status_code=400, detail="User ID missing from token")
-
     CallRecoding = upload_recording_service(
-        Recording, staff_id, start_time, end_time, CallDuration, store_id, db, token
+        Recording, staff_id, start_time, end_time, CallDuration, store_id, db, principal
     )
 
     recording_data = {
@@ -62,16 +72,18 @@ def upload_recording(
         "audio_length": CallRecoding.audio_length,
         "file_url": CallRecoding.file_url,
     }
-    if(CallRecoding.call_duration > 300):
-        transcribe_audio(recording_data["id"], db)
+    if(CallRecoding.call_duration > TRANSCRIBE_MIN_CALL_DURATION):
+        job = enqueue_transcription(db, recording_data["id"], source_path=CallRecoding.local_path)
+        recording_data["transcription_job_id"] = job.id
 
     return RecordingResponse(**recording_data)
 
 
 @router.get("/get-recordings", response_model=List[GetRecording])
-def get_recordings(
-    db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+async def get_recordings(
+    response: Response,
+    db: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(get_principal),
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     timeline: Optional[str] = Query(None, description="Timeline e.g. Last 7 days, Last 30 days, Previous month, Last 90 days, Last 365 days, All time"),
@@ -79,14 +91,50 @@ def get_recordings(
     regional_id: Optional[str] = None,
     state_id: Optional[str] = None,
     city_id: Optional[str] = None,
+    limit: int = Query(RECORDINGS_PAGE_SIZE, ge=1, le=RECORDINGS_MAX_PAGE_SIZE, description="Recordings per page"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. recording_id,file_url,created_at"),
 ):
-    user_id = token.get("user_id")
-    user_role_str = token.get("role")
+    """
+    Recordings in scope, newest first, one page at a time. At most `limit`
+    recordings (200 by default) are returned; this endpoint used to return every
+    recording in range. When there are more, the X-Next-Cursor response header
+    holds the cursor to pass as `cursor` for the next page.
+    """
+    return await db.run_sync(
+        _get_recordings,
+        response=response,
+        principal=principal,
+        start_date=start_date,
+        end_date=end_date,
+        timeline=timeline,
+        store_id=store_id,
+        regional_id=regional_id,
+        state_id=state_id,
+        city_id=city_id,
+        limit=limit,
+        cursor=cursor,
+        fields=fields,
+    )
 
-    try:
-        user_role = RoleEnum(user_role_str)
-    except ValueError:
-        raise HTTPException(status_code=403, detail="Invalid user role.")
+
+def _get_recordings(
+    db: Session,
+    response,
+    principal,
+    start_date,
+    end_date,
+    timeline,
+    store_id,
+    regional_id,
+    state_id,
+    city_id,
+    limit,
+    cursor,
+    fields,
+):
+    user_id = principal.user_id
+    user_role = principal.role
 
     # Use timeline to override start and end date if they are not manually provided
     if not start_date and not end_date:
@@ -94,59 +142,60 @@ def get_recordings(
     else:
         start_date_obj, end_date_obj = parse_dates(start_date, end_date)
 
-    # Determine downline users based on role and filters
-    users = []
-
-    if city_id:
-        l1_users = db.query(L1).filter(L1.L1_id == city_id).all()
-        users = [u for l1 in l1_users for u in extract_users(l1.user_id, RoleEnum.L1, db)]
-    elif state_id:
-        l3_users = db.query(L3).filter(L3.L3_id == state_id).all()
-        users = [u for l3 in l3_users for u in extract_users(l3.user_id, RoleEnum.L3, db)]
-    elif regional_id:
+    # Regional filter permissions (city and state filters take precedence)
+    if regional_id and not (city_id or state_id):
         if user_role in [RoleEnum.L0, RoleEnum.L1]:
             raise HTTPException(status_code=403, detail="L0 and L1 users cannot filter by regional ID.")
-        elif user_role == RoleEnum.L2:
-            l2_region = db.query(L2).filter(L2.L2_id == regional_id).first()
+        l2_region = db.query(L2).filter(L2.L2_id == regional_id).first()
+        if user_role == RoleEnum.L2:
             if not l2_region or l2_region.user_id != user_id:
                 raise HTTPException(status_code=403, detail="L2 users can only access their own region.")
-            regional_user_id = l2_region.user_id
-        else:
-            l2_region = db.query(L2).filter(L2.L2_id == regional_id).first()
-            if not l2_region:
-                raise HTTPException(status_code=404, detail="Invalid regional ID provided.")
-            regional_user_id = l2_region.user_id
+        elif not l2_region:
+            raise HTTPException(status_code=404, detail="Invalid regional ID provided.")
 
-        users = extract_users(regional_user_id, RoleEnum.L2, db)
-    else:
-        users = extract_users(user_id, user_role, db)
+    # Determine downline users based on role and filters
+    downline_user_ids = resolve_scope_user_ids(
+        db, user_id, user_role, city_id=city_id, state_id=state_id, regional_id=regional_id
+    )
 
-    downline_user_ids = [u.user_id for u in users if u]
+    if fields:
+        selected = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = selected - set(GetRecording.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    else:
+        selected = None
 
-    # Get recordings
-    recordings = extract_recordings(
-        db, user_id, user_role,
-        start_date=start_date_obj,
-        end_date=end_date_obj,
-        store_id=store_id,
-        user_ids=downline_user_ids
-    )
+    # One page of recordings, newest first
+    try:
+        recordings, next_cursor = recordings_page(
+            db,
+            recording_filters(downline_user_ids, start_date_obj, end_date_obj, store_id),
+            limit,
+            cursor,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    # Get transcriptions for these recordings
-    recording_ids = [rec.id for rec in recordings]
+    # Transcriptions for this page only, and only when they were asked for
     transcriptions = {}
-    if recording_ids:
-        transcription_records = db.query(Transcription).filter(
-            Transcription.audio_id.in_(recording_ids)
+    wants_text = selected is None or "transcription_text" in selected
+    wants_id = selected is None or "transcription_id" in selected
+    if recordings and (wants_text or wants_id):
+        columns = [Transcription.audio_id, Transcription.id]
+        if wants_text:
+            columns.append(Transcription.transcription_text)
+        transcription_records = db.query(*columns).filter(
+            Transcription.audio_id.in_([rec.id for rec in recordings])
         ).all()
         for trans in transcription_records:
             transcriptions[trans.audio_id] = {
                 "id": trans.id,
-                "text": trans.transcription_text
+                "text": trans.transcription_text if wants_text else None,
             }
 
     # Prepare response
-    return [
+    results = [
         GetRecording(
             recording_id=rec.id,
             user_id=rec.user_id,
@@ -170,6 +219,16 @@ def get_recordings(
         for rec in recordings
     ]
 
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if selected is None:
+        response.headers.update(headers)
+        return results
+    return JSONResponse(
+        content=jsonable_encoder([result.model_dump(include=selected) for result in results]),
+        headers=headers,
+    )
+
+
 def parse_timeline(timeline: str):
     today = date.today()
 
@@ -241,44 +300,31 @@ def get_last_recording(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
     try:
-        token_user_id = token.get("user_id")
-        role_str = token.get("role")
-
-        if not token_user_id:
-            raise HTTPException(status_code=401, detail="Unauthorized")
-
-        try:
-            user_role = RoleEnum(role_str)
-        except ValueError:
-            raise HTTPException(status_code=403, detail="Invalid user role")
+        token_user_id = principal.user_id
+        user_role = principal.role
 
         # Determine user scope
-        users = []
+        user_ids = []
 
         if user_id:
-            users = [db.query(User).filter(User.user_id == user_id).first()]
+            user_ids = [user_id]
         elif regional_id:
-            l2 = db.query(L2).filter(L2.L2_id == regional_id).first()
-            if not l2:
+            if not db.query(L2.L2_id).filter(L2.L2_id == regional_id).first():
                 raise HTTPException(status_code=404, detail="Region not found")
-            users = extract_users(l2.user_id, RoleEnum.L2, db)
+            user_ids = resolve_scope_user_ids(db, token_user_id, user_role, regional_id=regional_id)
         elif city_id:
-            l1 = db.query(L1).filter(L1.L1_id == city_id).first()
-            if not l1:
+            if not db.query(L1.L1_id).filter(L1.L1_id == city_id).first():
                 raise HTTPException(status_code=404, detail="City not found")
-            users = extract_users(l1.user_id, RoleEnum.L1, db)
+            user_ids = resolve_scope_user_ids(db, token_user_id, user_role, city_id=city_id)
         elif state_id:
-            l3 = db.query(L3).filter(L3.L3_id == state_id).first()
-            if not l3:
+            if not db.query(L3.L3_id).filter(L3.L3_id == state_id).first():
                 raise HTTPException(status_code=404, detail="State not found")
-            users = extract_users(l3.user_id, RoleEnum.L3, db)
+            user_ids = resolve_scope_user_ids(db, token_user_id, user_role, state_id=state_id)
         else:
-            users = extract_users(token_user_id, user_role, db)
-
-        user_ids = [u.user_id for u in users if u]
+            user_ids = resolve_scope_user_ids(db, token_user_id, user_role)
 
         # Date filtering
         if timeline:
@@ -340,61 +386,60 @@ def get_last_recording(
 
 
 @router.get("/get-daily-recording-hours", response_model=dict)
-def get_daily_recording_hours(
+async def get_daily_recording_hours(
     timeline: Optional[str] = Query("Last 7 days", description="Timeline e.g. Last 7 days, Last 30 days, Previous month, Last 90 days, Last 365 days, All time"),
     user_id: Optional[str] = Query(None, description="User ID to fetch recording hours for"),
     regional_id: Optional[str] = Query(None, description="Optional Region (L2) ID"),
     state_id: Optional[str] = Query(None, description="Optional State (L3) ID"),
     city_id: Optional[str] = Query(None, description="Optional City (L1) ID"),
-    db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(get_principal),
 ):
-    try:
-        token_user_id = token.get("user_id")
-        role_str = token.get("role")
+    """
+    Recorded hours per day. A recording counts towards the day it was created
+    (uploaded), the same column /get-recordings filters on; before the daily
+    rollup it counted towards the day its call started.
+    """
+    return await db.run_sync(
+        _get_daily_recording_hours,
+        timeline=timeline,
+        user_id=user_id,
+        regional_id=regional_id,
+        state_id=state_id,
+        city_id=city_id,
+        principal=principal,
+    )
 
-        if not token_user_id:
-            raise HTTPException(status_code=401, detail="Unauthorized")
 
-        try:
-            user_role = RoleEnum(role_str)
-        except ValueError:
-            raise HTTPException(status_code=403, detail="Invalid user role provided in token.")
+def _get_daily_recording_hours(
+    db: Session,
+    timeline,
+    user_id,
+    regional_id,
+    state_id,
+    city_id,
+    principal,
+):
+    try:
+        token_user_id = principal.user_id
+        user_role = principal.role
 
         # Determine target users based on filters
-        users = []
-
         if user_id:
-            users = [db.query(User).filter(User.user_id == user_id).first()]
-        elif city_id:
-            l1_users = db.query(L1).filter(L1.L1_id == city_id).all()
-            users = [u for l1 in l1_users for u in extract_users(l1.user_id, RoleEnum.L1, db)]
-        elif state_id:
-            l3_users = db.query(L3).filter(L3.L3_id == state_id).all()
-            users = [u for l3 in l3_users for u in extract_users(l3.user_id, RoleEnum.L3, db)]
-        elif regional_id:
-            l2 = db.query(L2).filter(L2.L2_id == regional_id).first()
-            if not l2:
-                raise HTTPException(status_code=404, detail="Region not found.")
-            users = extract_users(l2.user_id, RoleEnum.L2, db)
+            user_ids = [user_id]
         else:
-            users = extract_users(token_user_id, user_role, db)
-
-        user_ids = [u.user_id for u in users if u]
+            if regional_id and not (city_id or state_id):
+                if not db.query(L2.L2_id).filter(L2.L2_id == regional_id).first():
+                    raise HTTPException(status_code=404, detail="Region not found.")
+            user_ids = resolve_scope_user_ids(
+                db, token_user_id, user_role, city_id=city_id, state_id=state_id, regional_id=regional_id
+            )
 
         start_date, end_date = parse_timeline(timeline)
 
-        daily_hours = (
-            db.query(
-                cast(VoiceRecording.start_time, Date).label("recording_date"),
-                func.sum(VoiceRecording.call_duration).label("total_duration"),
-            )
-            .filter(VoiceRecording.user_id.in_(user_ids))
-            .filter(VoiceRecording.start_time >= start_date)
-            .filter(VoiceRecording.start_time <= end_date + timedelta(days=1))
-            .group_by(cast(VoiceRecording.start_time, Date))
-            .order_by("recording_date")
-            .all()
+        daily_hours = rollup_daily_duration(
+            db,
+            rollup_filters(user_ids, start_date.date(), end_date.date()),
         )
 
         if not daily_hours:
@@ -417,7 +462,7 @@ def get_daily_recording_hours(
 
 @router.get("/recordings-insights", response_model=dict)
 @check_role([RoleEnum.L1, RoleEnum.L2, RoleEnum.L3, RoleEnum.L4])
-def get_recordings_insights(
+async def get_recordings_insights(
     user_id: Optional[str] = Query(None, description="User ID to fetch insights for"),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
@@ -425,20 +470,41 @@ def get_recordings_insights(
     state_id: Optional[str] = Query(None, description="State ID (L3 ID)"),
     city_id: Optional[str] = Query(None, description="City ID (L1 ID)"),
     timeline: Optional[str] = Query(None, description="Timeline e.g. Last 7 days, Last 30 days,Previous month,Last 90 days,Last 365 days, All time"),
-    db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(get_principal),
 ):
-    try:
-        token_user_id = token.get("user_id")
-        role_str = token.get("role")
+    """
+    Recording totals for the recordings created in the date range, counted in
+    whole days as on /get-recordings. peak_hours counts recordings by the hour
+    their call started.
+    """
+    return await db.run_sync(
+        _get_recordings_insights,
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date,
+        regional_id=regional_id,
+        state_id=state_id,
+        city_id=city_id,
+        timeline=timeline,
+        principal=principal,
+    )
 
-        if not token_user_id:
-            raise HTTPException(status_code=401, detail="Unauthorized")
 
-        try:
-            user_role = RoleEnum(role_str)
-        except ValueError:
-            raise HTTPException(status_code=403, detail="Invalid user role provided in token.")
+def _get_recordings_insights(
+    db: Session,
+    user_id,
+    start_date,
+    end_date,
+    regional_id,
+    state_id,
+    city_id,
+    timeline,
+    principal,
+):
+    try:
+        token_user_id = principal.user_id
+        user_role = principal.role
 
         # Parse date range
         if timeline and (start_date or end_date):
@@ -448,22 +514,14 @@ def get_recordings_insights(
         else:
             start_date_obj, end_date_obj = parse_dates(start_date, end_date)
 
-        user_reports = None
-
         # Priority: city_id > state_id > regional_id
         if city_id:
-            city = db.query(L1).filter(L1.L1_id == city_id).first()
-            if not city:
+            if not db.query(L1.L1_id).filter(L1.L1_id == city_id).first():
                 raise HTTPException(status_code=404, detail="Invalid city_id")
-            city_user_id = city.user_id
-            user_reports = extract_users(city_user_id, RoleEnum.L1, db)
 
         elif state_id:
-            state = db.query(L3).filter(L3.L3_id == state_id).first()
-            if not state:
+            if not db.query(L3.L3_id).filter(L3.L3_id == state_id).first():
                 raise HTTPException(status_code=404, detail="Invalid state_id")
-            state_user_id = state.user_id
-            user_reports = extract_users(state_user_id, RoleEnum.L3, db)
 
         elif regional_id:
             if user_role in [RoleEnum.L0, RoleEnum.L1]:
@@ -473,58 +531,31 @@ def get_recordings_insights(
                 raise HTTPException(status_code=404, detail="Invalid regional ID provided.")
             if user_role == RoleEnum.L2 and l2.user_id != token_user_id:
                 raise HTTPException(status_code=403, detail="L2 users can only access their own region.")
-            regional_user_id = l2.user_id
-            user_reports = extract_users(regional_user_id, RoleEnum.L2, db)
 
-        else:
-            user_reports = extract_users(token_user_id, user_role, db)
+        report_user_ids = resolve_scope_user_ids(
+            db, token_user_id, user_role, city_id=city_id, state_id=state_id, regional_id=regional_id
+        )
 
         # Filter down if user_id is specifically provided
         if user_id:
-            allowed_user_ids = {user.user_id for user in user_reports}
-            if user_id not in allowed_user_ids:
+            if user_id not in set(report_user_ids):
                 raise HTTPException(status_code=403, detail="You don't have permission to access this user's insights.")
             user_ids = [user_id]
         else:
-            user_ids = [user.user_id for user in user_reports]
+            user_ids = report_user_ids
 
-        filters = [
-            VoiceRecording.user_id.in_(user_ids),
-            VoiceRecording.created_at >= start_date_obj,
-            VoiceRecording.created_at <= end_date_obj,
-        ]
+        filters = rollup_filters(user_ids, start_date_obj.date(), end_date_obj.date())
 
         # === Insights calculation ===
-        total_seconds = db.query(func.sum(VoiceRecording.call_duration)).filter(*filters).scalar() or 0
-        total_hours = total_seconds / 3600
+        insights = recording_insights(db, filters)
 
-        total_recordings = db.query(func.count(VoiceRecording.id)).filter(*filters).scalar() or 0
-
-        avg_length = db.query(func.avg(VoiceRecording.call_duration)).filter(*filters).scalar()
+        total_hours = insights["total_seconds"] / 3600
+        total_recordings = insights["total_recordings"]
+        avg_length = insights["average_seconds"]
         avg_minutes = round(avg_length / 60, 2) if avg_length else 0
-
-        hourly_counts = (
-            db.query(
-                func.extract("hour", VoiceRecording.start_time).label("hour_of_day"),
-                func.count().label("call_count"),
-            )
-            .filter(*filters)
-            .group_by(func.extract("hour", VoiceRecording.start_time))
-            .order_by(func.count().desc())
-            .all()
-        )
-        peak_hours = {int(r.hour_of_day): r.call_count for r in hourly_counts}
-
-        total_listening_seconds = db.query(func.sum(VoiceRecording.listening_time)).filter(*filters).scalar() or 0
-        total_listening_hours = total_listening_seconds / 3600
-
-        last_listening = (
-            db.query(VoiceRecording.last_listening_time)
-            .filter(*filters)
-            .order_by(VoiceRecording.last_listening_time.desc())
-            .first()
-        )
-        last_listening_time = last_listening[0] if last_listening else None
+        peak_hours = insights["peak_hours"]
+        total_listening_hours = insights["total_listening_seconds"] / 3600
+        last_listening_time = insights["last_listening_time"]
 
         return {
             "user_id": user_id if user_id else token_user_id,
@@ -547,21 +578,19 @@ def update_listening_time(
         ..., description="Time in seconds user listened to the recording"
     ),
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
     try:
-        token_user_id = token.get("user_id")
-        if not token_user_id:
-            raise HTTPException(status_code=401, detail="Unauthorized")
-
         recording = (
             db.query(VoiceRecording).filter(VoiceRecording.id == recording_id).first()
         )
         if not recording:
             raise HTTPException(status_code=404, detail="Recording not found")
 
+        previous_listening_time = recording.listening_time
         recording.listening_time = listening_time
         recording.last_listening_time = datetime.utcnow()
+        record_listening(db, recording, previous_listening_time)
         db.commit()
         db.refresh(recording)
 
@@ -583,18 +612,10 @@ def update_listening_time(
 def delete_recording(
     recording_id: str,
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
     try:
-        token_user_id = token.get("user_id")
-        role_str = token.get("role")
-        if not token_user_id:
-            raise HTTPException(status_code=401, detail="Unauthorized")
-
-        try:
-            user_role = RoleEnum(role_str)
-        except ValueError:
-            raise HTTPException(status_code=403, detail="Invalid user role.")
+        user_role = principal.role
 
         if user_role != RoleEnum.L4:
             raise HTTPException(
@@ -608,6 +629,7 @@ def delete_recording(
         if not recording:
             raise HTTPException(status_code=404, detail="Recording not found")
 
+        record_delete(db, recording)
         db.delete(recording)
         db.commit()
         return {
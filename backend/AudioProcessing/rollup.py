@@ -0,0 +1,247 @@
+"""
+Incremental maintenance of recording_daily_rollup.
+
+Rows are keyed by DATE(created_at), the column the recording list endpoints
+filter on, so the totals of a date range match the recordings listed for it.
+The hour-of-day histogram counts by the hour of start_time, and
+transcription_count counts the transcription rows stored for the day's
+recordings. Every write that changes a voice_recording row's totals, or adds a
+transcription, calls one of the record_* helpers in the same transaction. To rebuild the table from scratch:
+
+    python -m backend.AudioProcessing.rollup
+"""
+from collections import defaultdict
+from datetime import timedelta
+from sqlalchemy import func, cast, Date
+from sqlalchemy.exc import IntegrityError
+from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording, RecordingDailyRollup
+from backend.Transcription.TranscriptionModel import Transcription
+
+
+def _rollup_key(recording):
+    return recording.user_id, recording.created_at.date(), recording.store_id or ""
+
+
+def _locked_row(db, user_id, day, store_id):
+    def lookup():
+        return (
+            db.query(RecordingDailyRollup)
+            .filter(
+                RecordingDailyRollup.user_id == user_id,
+                RecordingDailyRollup.day == day,
+                RecordingDailyRollup.store_id == store_id,
+            )
+            .with_for_update()
+            .first()
+        )
+
+    row = lookup()
+    if row is not None:
+        return row
+
+    row = RecordingDailyRollup(
+        user_id=user_id,
+        day=day,
+        store_id=store_id,
+        recording_count=0,
+        duration_sum=0,
+        listening_sum=0,
+        hourly_counts=[0] * 24,
+        transcription_count=0,
+    )
+    try:
+        with db.begin_nested():
+            db.add(row)
+    except IntegrityError:
+        # another request created the row first
+        row = lookup()
+    return row
+
+
+def _bump(db, recording, sign):
+    row = _locked_row(db, *_rollup_key(recording))
+    row.recording_count += sign
+    row.duration_sum += sign * (recording.call_duration or 0)
+    row.listening_sum += sign * (recording.listening_time or 0)
+    hourly = list(row.hourly_counts)
+    hourly[recording.start_time.hour] += sign
+    row.hourly_counts = hourly
+    if sign < 0:
+        # the deleted recording may have been the latest one listened to
+        user_id, day, store_id = _rollup_key(recording)
+        row.last_listening_time = (
+            db.query(func.max(VoiceRecording.last_listening_time))
+            .filter(
+                VoiceRecording.user_id == user_id,
+                VoiceRecording.created_at >= day,
+                VoiceRecording.created_at < day + timedelta(days=1),
+                func.coalesce(VoiceRecording.store_id, "") == store_id,
+                VoiceRecording.id != recording.id,
+            )
+            .scalar()
+        )
+    elif recording.last_listening_time and (
+        row.last_listening_time is None or recording.last_listening_time > row.last_listening_time
+    ):
+        row.last_listening_time = recording.last_listening_time
+
+
+def record_upload(db, recording):
+    _bump(db, recording, 1)
+
+
+def record_delete(db, recording):
+    _bump(db, recording, -1)
+    # the transcription rows stay behind but no longer join to a recording
+    transcriptions = (
+        db.query(func.count(Transcription.id)).filter(Transcription.audio_id == recording.id).scalar()
+    )
+    if transcriptions:
+        row = _locked_row(db, *_rollup_key(recording))
+        row.transcription_count -= transcriptions
+
+
+def record_transcription(db, recording):
+    row = _locked_row(db, *_rollup_key(recording))
+    row.transcription_count += 1
+
+
+def record_listening(db, recording, previous_listening_time):
+    row = _locked_row(db, *_rollup_key(recording))
+    row.listening_sum += (recording.listening_time or 0) - (previous_listening_time or 0)
+    if recording.last_listening_time and (
+        row.last_listening_time is None or recording.last_listening_time > row.last_listening_time
+    ):
+        row.last_listening_time = recording.last_listening_time
+
+
+def rollup_filters(user_ids, start_day=None, end_day=None):
+    filters = [RecordingDailyRollup.user_id.in_(user_ids)]
+    if start_day is not None:
+        filters.append(RecordingDailyRollup.day >= start_day)
+    if end_day is not None:
+        filters.append(RecordingDailyRollup.day <= end_day)
+    return filters
+
+
+def rollup_totals(db, filters):
+    """Recording count, duration, listening, hour histogram and last listening time."""
+    row = db.query(
+        func.sum(RecordingDailyRollup.recording_count).label("recording_count"),
+        func.sum(RecordingDailyRollup.duration_sum).label("duration_sum"),
+        func.sum(RecordingDailyRollup.listening_sum).label("listening_sum"),
+        func.max(RecordingDailyRollup.last_listening_time).label("last_listening_time"),
+        *[
+            func.sum(func.json_extract(RecordingDailyRollup.hourly_counts, f"$[{hour}]")).label(f"h{hour}")
+            for hour in range(24)
+        ],
+    ).filter(*filters).one()
+
+    return {
+        "recording_count": int(row.recording_count or 0),
+        "duration_sum": row.duration_sum or 0,
+        "listening_sum": row.listening_sum or 0,
+        "last_listening_time": row.last_listening_time,
+        "hourly_counts": [int(getattr(row, f"h{hour}") or 0) for hour in range(24)],
+    }
+
+
+def rollup_transcription_counts(db, filters, bucket_column):
+    """Transcription counts per bucket_column value (an expression over RecordingDailyRollup.day)."""
+    return (
+        db.query(
+            bucket_column.label("bucket"),
+            func.sum(RecordingDailyRollup.transcription_count).label("count"),
+        )
+        .filter(*filters)
+        .group_by("bucket")
+        .all()
+    )
+
+
+def rollup_daily_duration(db, filters):
+    return (
+        db.query(
+            RecordingDailyRollup.day.label("recording_date"),
+            func.sum(RecordingDailyRollup.duration_sum).label("total_duration"),
+        )
+        .filter(*filters)
+        .group_by(RecordingDailyRollup.day)
+        .having(func.sum(RecordingDailyRollup.recording_count) > 0)
+        .order_by(RecordingDailyRollup.day)
+        .all()
+    )
+
+
+def backfill_rollup(db):
+    """Rebuild recording_daily_rollup from voice_recording in one grouped scan."""
+    day = cast(VoiceRecording.created_at, Date)
+    hour = func.extract("hour", VoiceRecording.start_time)
+    groups = (
+        db.query(
+            VoiceRecording.user_id,
+            day.label("day"),
+            VoiceRecording.store_id,
+            hour.label("hour"),
+            func.count().label("recording_count"),
+            func.sum(VoiceRecording.call_duration).label("duration_sum"),
+            func.sum(VoiceRecording.listening_time).label("listening_sum"),
+            func.max(VoiceRecording.last_listening_time).label("last_listening_time"),
+        )
+        .group_by(VoiceRecording.user_id, day, VoiceRecording.store_id, hour)
+        .all()
+    )
+    transcription_groups = (
+        db.query(
+            VoiceRecording.user_id,
+            day.label("day"),
+            VoiceRecording.store_id,
+            func.count(Transcription.id).label("transcription_count"),
+        )
+        .join(Transcription, Transcription.audio_id == VoiceRecording.id)
+        .group_by(VoiceRecording.user_id, day, VoiceRecording.store_id)
+        .all()
+    )
+
+    rows = defaultdict(
+        lambda: {
+            "recording_count": 0,
+            "duration_sum": 0,
+            "listening_sum": 0,
+            "last_listening_time": None,
+            "hourly_counts": [0] * 24,
+            "transcription_count": 0,
+        }
+    )
+    for group in groups:
+        row = rows[(group.user_id, group.day, group.store_id or "")]
+        row["recording_count"] += group.recording_count
+        row["duration_sum"] += group.duration_sum or 0
+        row["listening_sum"] += group.listening_sum or 0
+        row["hourly_counts"][int(group.hour)] += group.recording_count
+        if group.last_listening_time and (
+            row["last_listening_time"] is None or group.last_listening_time > row["last_listening_time"]
+        ):
+            row["last_listening_time"] = group.last_listening_time
+    for group in transcription_groups:
+        rows[(group.user_id, group.day, group.store_id or "")]["transcription_count"] += group.transcription_count
+
+    db.query(RecordingDailyRollup).delete(synchronize_session=False)
+    mappings = [
+        {"user_id": user_id, "day": day, "store_id": store_id, **values}
+        for (user_id, day, store_id), values in rows.items()
+    ]
+    for start in range(0, len(mappings), 1000):
+        db.execute(RecordingDailyRollup.__table__.insert(), mappings[start:start + 1000])
+    db.commit()
+    return len(mappings)
+
+
+if __name__ == "__main__":
+    from backend.db.db import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Rebuilt {backfill_rollup(session)} recording_daily_rollup rows")
+    finally:
+        session.close()
@@ -16,6 +16,7 @@ class RecordingResponse(BaseModel):
     call_duration: float
     audio_length: float
     file_url: str
+    transcription_job_id: Optional[str] = None
 
 
 class GetRecording(BaseModel):
@@ -1,15 +1,23 @@
-import boto3
-from botocore.client import Config
+from boto3.s3.transfer import TransferConfig
 from fastapi import HTTPException
 from botocore.exceptions import BotoCoreError, NoCredentialsError, EndpointConnectionError
+from backend import metrics
+from backend.storage import storage
 from backend.config import TenantSettings
-from backend.AudioProcessing.utils import file_storage
+from backend.AudioProcessing.spool import new_spool_path, release_spool
+from backend.AudioProcessing.utils import CountingReader, file_storage
 from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording
+from backend.AudioProcessing.rollup import record_upload, rollup_totals
+from backend.schemas.TranscriptionSchema import TransctriptionStatus
 from datetime import datetime
+from sqlalchemy import func, case, and_, or_
+import base64
+import binascii
 import io
+import json
 import os
 from backend.Store.StoreModel import L0
-from backend.User.service import extract_users
+from backend.User.service import resolve_user_ids
 from backend.User.UserModel import User
 
 settings = TenantSettings()
@@ -18,62 +26,90 @@ settings = TenantSettings()
 # from pydub.utils import mediainfo
 
 
+TRANSCRIBE_MIN_CALL_DURATION = 300  # seconds; shorter calls are not transcribed
+
+transfer_config = TransferConfig(
+    multipart_threshold=settings.S3_MULTIPART_PART_SIZE,
+    multipart_chunksize=settings.S3_MULTIPART_PART_SIZE,
+    max_concurrency=settings.S3_MULTIPART_CONCURRENCY,
+    use_threads=settings.S3_MULTIPART_CONCURRENCY > 1,
+)
+
+
+def stream_to_s3(upload, key, spool_path=None):
+    """
+    Forward the upload to S3 as a multipart upload in a single pass, optionally
+    teeing it into spool_path. Returns the number of bytes sent.
+    """
+    spool = open(spool_path, "wb") if spool_path else None
+    reader = CountingReader(upload.file, spool)
+    try:
+        storage.upload_fileobj(reader, key, "audio/mp3", transfer_config)
+    except Exception:
+        if spool:
+            spool.close()
+            release_spool(spool_path)
+        raise
+    finally:
+        if spool and not spool.closed:
+            spool.close()
+    metrics.incr("upload.bytes", reader.bytes_read)
+    return reader.bytes_read
+
+
 def upload_recording(
-    Recording, staff_id, start_time, end_time, CallDuration, store_id, db, token
+    Recording, staff_id, start_time, end_time, CallDuration, store_id, db, principal
 ):
-    affilated_user_id = token.get("user_id")
-
-    # S3 config
-    S3_access_key = settings.S3_ACCESS_KEY
-    S3_access_secret = settings.S3_SECRET_KEY
-    S3_bucket_name = settings.S3_BUCKET_NAME
-    S3_EndPoint = settings.S3_ENDPOINT
-    S3_CDN = settings.S3_CDN
-
-    client_s3 = boto3.client(
-        "s3",
-        endpoint_url=S3_EndPoint,
-        aws_access_key_id=S3_access_key,
-        aws_secret_access_key=S3_access_secret,
-        config=Config(signature_version="s3v4", region_name="auto"),
-    )
+    affilated_user_id = principal.user_id
 
     store_fname = Recording.filename
     f_name, *etn = store_fname.split(".")
 
-    file_path, file_exe = file_storage(Recording, f_name)
-    file_size = round(os.path.getsize(file_path) / (1024 * 1024), 2)
-
     if CallDuration is None:
         duration = end_time - start_time
         CallDuration = duration.total_seconds()
+    else:
+        CallDuration = float(CallDuration)
 
-    try:
-        with open(file_path, "rb") as data:
-            # Ensure pointer is at the beginning
-            data.seek(0)
+    # local copy handed to the transcription worker, if any
+    local_path = None
 
-            current_datetime = datetime.now()
-            formatted_datetime = (
-                current_datetime.strftime("%Y%m%d%H%M%S%f") + "." + str(etn[0])
-            )
+    try:
+        current_datetime = datetime.now()
+        formatted_datetime = (
+            current_datetime.strftime("%Y%m%d%H%M%S%f") + "." + str(etn[0])
+        )
+        object_key = f"{str(affilated_user_id)}/{formatted_datetime}"
 
-            # Upload to S3
-            client_s3.upload_fileobj(
-                data,
-                S3_bucket_name,
-                f"{str(affilated_user_id)}/{formatted_datetime}",
-                ExtraArgs={"ContentType": "audio/mp3"},
-            )
+        if settings.UPLOAD_STREAMING:
+            # spool to disk only when the recording is going to be transcribed
+            if CallDuration > TRANSCRIBE_MIN_CALL_DURATION:
+                local_path = new_spool_path(etn[0])
+            size_bytes = stream_to_s3(Recording, object_key, local_path)
+        else:
+            file_path, file_exe = file_storage(Recording, f_name)
+            size_bytes = os.path.getsize(file_path)
+            local_path = file_path
+            with open(file_path, "rb") as data:
+                # Upload to S3
+                storage.upload_fileobj(data, object_key, "audio/mp3", transfer_config)
+            if CallDuration <= TRANSCRIBE_MIN_CALL_DURATION:
+                # not transcribed, nothing will read the local copy
+                release_spool(local_path)
+                local_path = None
 
     except NoCredentialsError:
+        release_spool(local_path)
         raise HTTPException(status_code=500, detail="AWS credentials not configured.")
     except (BotoCoreError, EndpointConnectionError) as e:
+        release_spool(local_path)
         raise HTTPException(status_code=500, detail=f"S3 upload failed: {str(e)}")
     except Exception as e:
+        release_spool(local_path)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
-    url = f"{S3_CDN}/{str(affilated_user_id)}/{formatted_datetime}"
+    url = storage.url(object_key)
+    file_size = round(size_bytes / (1024 * 1024), 2)
 
     new_call_recording = VoiceRecording(
         user_id=affilated_user_id,
@@ -86,26 +122,34 @@ def upload_recording(
         call_duration=CallDuration,
     )
 
-    db.add(new_call_recording)
-    db.commit()
+    try:
+        db.add(new_call_recording)
+        db.flush()
+        record_upload(db, new_call_recording)
+        db.commit()
+    except Exception:
+        db.rollback()
+        release_spool(local_path)
+        raise
 
+    # not persisted; lets a same-host transcription skip the CDN download
+    new_call_recording.local_path = local_path
     return new_call_recording
 
 def extract_recordings(db, user_id, user_role, start_date, end_date, store_id, user_ids):
     if user_ids is None:
-        users = extract_users(user_id, user_role, db)
-        user_ids = [user.user_id for user in users]
+        user_ids = resolve_user_ids(user_id, user_role, db)
 
-    query = db.query(VoiceRecording).filter(
-        VoiceRecording.user_id.in_(user_ids),
-        VoiceRecording.created_at >= start_date,
-        VoiceRecording.created_at <= end_date,
+    recordings = (
+        db.query(VoiceRecording)
+        .filter(*recording_filters(user_ids, start_date, end_date, store_id))
+        .all()
     )
+    return attach_store_info(db, recordings)
 
-    if store_id:
-        query = query.filter(VoiceRecording.store_id == store_id)
 
-    recordings = query.all()
+def attach_store_info(db, recordings):
+    """Set store_name/store_code/store_address/asm_name on each recording from its L0 store."""
     store_ids = {rec.store_id for rec in recordings if rec.store_id}
 
     if store_ids:
@@ -148,3 +192,108 @@ def extract_recordings(db, user_id, user_role, start_date, end_date, store_id, u
         rec.asm_name = store["asm_name"]
 
     return recordings
+
+
+def encode_cursor(created_at, recording_id):
+    payload = json.dumps({"c": created_at.isoformat(), "i": recording_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(created_at, id) from a cursor; raises ValueError if it is malformed."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["c"]), str(payload["i"])
+    except (KeyError, TypeError, binascii.Error, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def recordings_page(db, filters, limit, cursor=None):
+    """
+    One page of recordings, newest first, keyed on (created_at, id). Returns the
+    recordings with store info attached and the cursor for the next page, or None
+    on the last page.
+    """
+    query = db.query(VoiceRecording).filter(*filters)
+    if cursor:
+        created_at, recording_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                VoiceRecording.created_at < created_at,
+                and_(VoiceRecording.created_at == created_at, VoiceRecording.id < recording_id),
+            )
+        )
+
+    recordings = (
+        query.order_by(VoiceRecording.created_at.desc(), VoiceRecording.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(recordings) > limit:
+        recordings = recordings[:limit]
+        last = recordings[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return attach_store_info(db, recordings), next_cursor
+
+
+def recording_insights(db, filters):
+    """
+    Recording totals, peak hours and last listening time for the recording_daily_rollup
+    rows matching filters, summed in a single query.
+    """
+    totals = rollup_totals(db, filters)
+
+    total_recordings = totals["recording_count"]
+    total_seconds = totals["duration_sum"]
+    hourly = [(hour, count) for hour, count in enumerate(totals["hourly_counts"]) if count]
+    hourly.sort(key=lambda item: item[1], reverse=True)
+
+    return {
+        "total_recordings": total_recordings,
+        "total_seconds": total_seconds,
+        "average_seconds": total_seconds / total_recordings if total_recordings else None,
+        "total_listening_seconds": totals["listening_sum"],
+        "peak_hours": dict(hourly),
+        "last_listening_time": totals["last_listening_time"],
+    }
+
+
+def recording_filters(user_ids, start_date, end_date, store_id=None):
+    """Recordings of user_ids created in [start_date, end_date], optionally for one store."""
+    filters = [
+        VoiceRecording.user_id.in_(user_ids),
+        VoiceRecording.created_at >= start_date,
+        VoiceRecording.created_at <= end_date,
+    ]
+    if store_id:
+        filters.append(VoiceRecording.store_id == store_id)
+    return filters
+
+
+def recording_status_breakdown(db, filters):
+    """Total, on-demand, failed, pending and completed counts for the scope in one query."""
+    status = VoiceRecording.transcription_status
+
+    def count_if(*conditions):
+        return func.coalesce(func.sum(case((and_(*conditions), 1), else_=0)), 0)
+
+    row = db.query(
+        func.count(VoiceRecording.id).label("total"),
+        count_if(
+            status == TransctriptionStatus.completed,
+            VoiceRecording.call_duration < TRANSCRIBE_MIN_CALL_DURATION,
+        ).label("on_demand"),
+        count_if(status == TransctriptionStatus.failure).label("failed"),
+        count_if(status == TransctriptionStatus.pending).label("pending"),
+        count_if(status == TransctriptionStatus.completed).label("completed"),
+    ).filter(*filters).one()
+
+    return {
+        "total": int(row.total),
+        "on_demand": int(row.on_demand),
+        "failed": int(row.failed),
+        "pending": int(row.pending),
+        "completed": int(row.completed),
+    }
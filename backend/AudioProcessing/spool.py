@@ -0,0 +1,79 @@
+"""
+Local copies of uploaded recordings kept for transcription.
+
+Streaming uploads write a spool file only when the recording will be
+transcribed; with UPLOAD_STREAMING off the upload is saved under upload_files/
+first. Either copy is released when the upload fails or is not transcribed, and
+otherwise by the transcription worker once the job finishes. Files whose job
+never ran are removed after UPLOAD_SPOOL_RETENTION seconds by sweep_spool, which
+runs when the worker pool starts or on demand with:
+
+    python -m backend.AudioProcessing.spool
+"""
+import os
+import time
+import uuid
+from backend import metrics
+from backend.config import TenantSettings
+
+settings = TenantSettings()
+
+
+def spool_dir():
+    return os.path.join(settings.BASE_UPLOAD_FOLDER, "spool")
+
+
+def upload_files_dir():
+    # where file_storage saves non-streaming uploads
+    return os.path.join(settings.BASE_UPLOAD_FOLDER, "upload_files")
+
+
+def local_copy_dirs():
+    return spool_dir(), upload_files_dir()
+
+
+def new_spool_path(extension):
+    directory = spool_dir()
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{uuid.uuid4()}.{extension}")
+
+
+def is_spool_file(path):
+    return bool(path) and os.path.dirname(os.path.abspath(path)) in {
+        os.path.abspath(directory) for directory in local_copy_dirs()
+    }
+
+
+def release_spool(path):
+    """Delete a local upload copy. Paths outside the spool and upload_files directories are left alone."""
+    if not is_spool_file(path):
+        return False
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    metrics.incr("upload.spool.released")
+    return True
+
+
+def sweep_spool(max_age=None):
+    """Remove local upload copies older than max_age seconds; returns how many were removed."""
+    max_age = settings.UPLOAD_SPOOL_RETENTION if max_age is None else max_age
+    cutoff = time.time() - max_age
+    removed = 0
+    for directory in local_copy_dirs():
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+    metrics.incr("upload.spool.swept", removed)
+    return removed
+
+
+if __name__ == "__main__":
+    print(f"Removed {sweep_spool()} expired spool files")
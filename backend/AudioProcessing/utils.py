@@ -34,3 +34,29 @@ def file_storage(file_name, f_name):
         shutil.copyfileobj(file_name.file, buffer)
 
     return save_full_path, file_exe
+
+
+class CountingReader:
+    """
+    Read-only wrapper around an upload stream that counts the bytes read and,
+    when `spool` is given, writes every chunk to it as well. It deliberately has
+    no seek/tell so boto3 reads it once, part by part.
+    """
+
+    def __init__(self, fileobj, spool=None):
+        self.fileobj = fileobj
+        self.spool = spool
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def read(self, size=-1):
+        chunk = self.fileobj.read(size)
+        self.bytes_read += len(chunk)
+        if self.spool is not None and chunk:
+            self.spool.write(chunk)
+        return chunk
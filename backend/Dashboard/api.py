@@ -1,11 +1,12 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from backend.User.service import extract_users
-from backend.db.db import get_session
+from backend.User.service import resolve_scope_user_ids
+from backend.db.db import get_async_session
 from typing_extensions import Annotated
 from backend.schemas.RoleSchema import RoleEnum
-from backend.auth.jwt_handler import verify_token
+from backend.auth.principal import Principal, get_principal
 from backend.Dashboard.schemas import *
 from backend.User.UserModel import User
 
@@ -13,21 +14,25 @@ router = APIRouter()
 
 
 @router.get("/last-login", response_model=LastLogin)
-def get_last_login(
+async def get_last_login(
     user_id: Optional[str] = Query(None, description="User ID to fetch last login for"),
-    db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(get_principal),
 ):
-    token_user_id = token.get("user_id")
-    role_str = token.get("role")
+    return await db.run_sync(
+        _get_last_login,
+        user_id=user_id,
+        principal=principal,
+    )
 
-    if not token_user_id:
-        raise HTTPException(status_code=401, detail="Unauthorized")
 
-    try:
-        user_role = RoleEnum(role_str)
-    except ValueError:
-        raise HTTPException(status_code=403, detail="Invalid role in token")
+def _get_last_login(
+    db: Session,
+    user_id,
+    principal,
+):
+    token_user_id = principal.user_id
+    user_role = principal.role
 
     # 🚀 **L0 Users Can Only Access Their Own Last Login**
     if user_role == RoleEnum.L0:
@@ -41,8 +46,7 @@ def get_last_login(
     else:
         if user_id:
             # Check if the requested user_id reports to the logged-in user
-            user_reports = extract_users(token_user_id, user_role, db)
-            allowed_user_ids = {user.user_id for user in user_reports}
+            allowed_user_ids = set(resolve_scope_user_ids(db, token_user_id, user_role))
 
             if user_id not in allowed_user_ids and user_role != RoleEnum.L3:
                 raise HTTPException(
@@ -65,7 +69,7 @@ def get_last_login(
 # @router.get("/available-staff", response_model=AvailableStaff)
 # async def create_store(
 #     db: Session = Depends(get_session),
-#     token: dict = Depends(verify_token),
+#     principal: Principal = Depends(get_principal),
 # ):
 #     pass
 
@@ -73,7 +77,7 @@ def get_last_login(
 # @router.get("/available-staff", response_model=AvailableStaff)
 # async def create_store(
 #     db: Session = Depends(get_session),
-#     token: dict = Depends(verify_token),
+#     principal: Principal = Depends(get_principal),
 # ):
 #     pass
 
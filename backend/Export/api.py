@@ -0,0 +1,134 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from backend.AudioProcessing.api import parse_dates, parse_timeline
+from backend.AudioProcessing.service import recording_filters
+from backend.Export.service import (
+    EXPORT_FORMATS,
+    FEEDBACK_COLUMNS,
+    RECORDING_COLUMNS,
+    TRANSCRIPTION_COLUMNS,
+    feedback_rows,
+    recording_rows,
+    stream_export,
+    transcription_rows,
+)
+from backend.User.service import resolve_scope_user_ids
+from backend.auth.principal import Principal, get_principal
+from backend.auth.role_checker import check_role
+from backend.db.db import get_session
+from backend.sales.SalesModel import L2
+from backend.schemas.RoleSchema import RoleEnum
+
+router = APIRouter()
+
+TIMELINE_DESCRIPTION = "Timeline e.g. Last 7 days, Last 30 days, Previous month, Last 90 days, Last 365 days, All time"
+FORMAT_DESCRIPTION = "ndjson (default) or csv"
+
+
+def resolve_export_scope(db, principal, start_date, end_date, timeline, regional_id, state_id, city_id):
+    """Scope user ids and date window, with the same checks as /get-recordings."""
+    user_id = principal.user_id
+    user_role = principal.role
+
+    if not start_date and not end_date:
+        try:
+            start_date_obj, end_date_obj = parse_timeline(timeline)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid timeline.")
+    else:
+        start_date_obj, end_date_obj = parse_dates(start_date, end_date)
+
+    # Regional filter permissions (city and state filters take precedence)
+    if regional_id and not (city_id or state_id):
+        if user_role in [RoleEnum.L0, RoleEnum.L1]:
+            raise HTTPException(status_code=403, detail="L0 and L1 users cannot filter by regional ID.")
+        l2_region = db.query(L2).filter(L2.L2_id == regional_id).first()
+        if user_role == RoleEnum.L2:
+            if not l2_region or l2_region.user_id != user_id:
+                raise HTTPException(status_code=403, detail="L2 users can only access their own region.")
+        elif not l2_region:
+            raise HTTPException(status_code=404, detail="Invalid regional ID provided.")
+
+    user_ids = resolve_scope_user_ids(
+        db, user_id, user_role, city_id=city_id, state_id=state_id, regional_id=regional_id
+    )
+    return user_ids, start_date_obj, end_date_obj
+
+
+def export_response(name, export_format, columns, row_source, *args):
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Invalid format. Use 'ndjson' or 'csv'")
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    return StreamingResponse(
+        stream_export(row_source, export_format, columns, *args),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/export/recordings")
+@check_role([RoleEnum.L1, RoleEnum.L2, RoleEnum.L3, RoleEnum.L4])
+def export_recordings(
+    db: Session = Depends(get_session),
+    principal: Principal = Depends(get_principal),
+    format: str = Query("ndjson", description=FORMAT_DESCRIPTION),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    timeline: Optional[str] = Query(None, description=TIMELINE_DESCRIPTION),
+    store_id: Optional[str] = None,
+    regional_id: Optional[str] = None,
+    state_id: Optional[str] = None,
+    city_id: Optional[str] = None,
+):
+    user_ids, start_date_obj, end_date_obj = resolve_export_scope(
+        db, principal, start_date, end_date, timeline, regional_id, state_id, city_id
+    )
+    filters = recording_filters(user_ids, start_date_obj, end_date_obj, store_id)
+    return export_response("recordings", format, RECORDING_COLUMNS, recording_rows, filters)
+
+
+@router.get("/export/feedbacks")
+@check_role([RoleEnum.L1, RoleEnum.L2, RoleEnum.L3, RoleEnum.L4])
+def export_feedbacks(
+    db: Session = Depends(get_session),
+    principal: Principal = Depends(get_principal),
+    format: str = Query("ndjson", description=FORMAT_DESCRIPTION),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    timeline: Optional[str] = Query(None, description=TIMELINE_DESCRIPTION),
+    store_id: Optional[str] = None,
+    regional_id: Optional[str] = None,
+    state_id: Optional[str] = None,
+    city_id: Optional[str] = None,
+):
+    user_ids, start_date_obj, end_date_obj = resolve_export_scope(
+        db, principal, start_date, end_date, timeline, regional_id, state_id, city_id
+    )
+    return export_response(
+        "feedbacks", format, FEEDBACK_COLUMNS, feedback_rows,
+        user_ids, start_date_obj, end_date_obj, store_id,
+    )
+
+
+@router.get("/export/transcriptions")
+@check_role([RoleEnum.L1, RoleEnum.L2, RoleEnum.L3, RoleEnum.L4])
+def export_transcriptions(
+    db: Session = Depends(get_session),
+    principal: Principal = Depends(get_principal),
+    format: str = Query("ndjson", description=FORMAT_DESCRIPTION),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    timeline: Optional[str] = Query(None, description=TIMELINE_DESCRIPTION),
+    store_id: Optional[str] = None,
+    regional_id: Optional[str] = None,
+    state_id: Optional[str] = None,
+    city_id: Optional[str] = None,
+):
+    user_ids, start_date_obj, end_date_obj = resolve_export_scope(
+        db, principal, start_date, end_date, timeline, regional_id, state_id, city_id
+    )
+    filters = recording_filters(user_ids, start_date_obj, end_date_obj, store_id)
+    return export_response("transcriptions", format, TRANSCRIPTION_COLUMNS, transcription_rows, filters)
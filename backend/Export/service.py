@@ -0,0 +1,175 @@
+"""
+Row streams behind the /export endpoints.
+
+Each stream opens its own session: the request's session is closed before a
+StreamingResponse body is sent. Rows come off a server-side cursor (yield_per)
+through a single joined query, since no other statement may run on the
+connection while it is streaming.
+"""
+import csv
+import io
+import json
+from backend.db.db import SessionLocal
+from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording
+from backend.Feedback.FeedbackModel import FeedbackModel
+from backend.Store.StoreModel import L0
+from backend.Transcription.TranscriptionModel import Transcription
+from backend.User.UserModel import Staff, User
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+RECORDING_COLUMNS = [
+    "recording_id", "user_id", "store_id", "store_name", "store_code", "asm_name",
+    "staff_id", "start_time", "end_time", "call_duration", "audio_length",
+    "listening_time", "file_url", "transcription_status", "created_at", "modified_at",
+]
+FEEDBACK_COLUMNS = [
+    "id", "audio_id", "user_id", "staff_id", "staff_name", "staff_email", "number",
+    "Billed", "feedback", "audio_url", "created_at", "modified_at",
+]
+TRANSCRIPTION_COLUMNS = [
+    "recording_id", "user_id", "store_id", "transcription_id", "transcription_text", "created_at",
+]
+
+
+def _recording_query(db, filters):
+    return (
+        db.query(
+            VoiceRecording,
+            L0.L0_name.label("store_name"),
+            L0.L0_code.label("store_code"),
+            User.name.label("asm_name"),
+        )
+        .outerjoin(L0, L0.L0_id == VoiceRecording.store_id)
+        .outerjoin(User, User.user_id == L0.user_id)
+        .filter(*filters)
+        .order_by(VoiceRecording.created_at)
+    )
+
+
+def recording_rows(db, filters):
+    for rec, store_name, store_code, asm_name in _recording_query(db, filters).yield_per(EXPORT_BATCH_SIZE):
+        yield {
+            "recording_id": rec.id,
+            "user_id": rec.user_id,
+            "store_id": rec.store_id,
+            "store_name": store_name or "Unknown",
+            "store_code": store_code or "Unknown",
+            "asm_name": asm_name or "Unknown",
+            "staff_id": rec.staff_id,
+            "start_time": rec.start_time,
+            "end_time": rec.end_time,
+            "call_duration": rec.call_duration,
+            "audio_length": rec.audio_length,
+            "listening_time": rec.listening_time or 0.0,
+            "file_url": rec.file_url,
+            "transcription_status": rec.transcription_status.name if rec.transcription_status else "pending",
+            "created_at": rec.created_at,
+            "modified_at": rec.modified_at,
+        }
+
+
+def feedback_rows(db, user_ids, start_date, end_date, store_id=None):
+    query = (
+        db.query(
+            FeedbackModel,
+            Staff.name.label("staff_name"),
+            Staff.email_id.label("staff_email"),
+            VoiceRecording.file_url.label("audio_url"),
+        )
+        .join(Staff, Staff.id == FeedbackModel.created_by)
+        .join(VoiceRecording, VoiceRecording.id == FeedbackModel.audio_id)
+        .filter(
+            FeedbackModel.user_id.in_(user_ids),
+            FeedbackModel.created_at >= start_date,
+            FeedbackModel.created_at <= end_date,
+        )
+        .order_by(FeedbackModel.created_at)
+    )
+    if store_id:
+        query = query.filter(VoiceRecording.store_id == store_id)
+
+    for feedback, staff_name, staff_email, audio_url in query.yield_per(EXPORT_BATCH_SIZE):
+        yield {
+            "id": feedback.id,
+            "audio_id": feedback.audio_id,
+            "user_id": feedback.user_id,
+            "staff_id": feedback.created_by,
+            "staff_name": staff_name,
+            "staff_email": staff_email,
+            "number": feedback.number,
+            "Billed": feedback.Billed,
+            "feedback": feedback.feedback,
+            "audio_url": audio_url,
+            "created_at": feedback.created_at,
+            "modified_at": feedback.modified_at,
+        }
+
+
+def transcription_rows(db, filters):
+    query = (
+        db.query(
+            VoiceRecording.id,
+            VoiceRecording.user_id,
+            VoiceRecording.store_id,
+            VoiceRecording.created_at,
+            Transcription.id.label("transcription_id"),
+            Transcription.transcription_text,
+        )
+        .join(Transcription, Transcription.audio_id == VoiceRecording.id)
+        .filter(*filters)
+        .order_by(VoiceRecording.created_at)
+    )
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        yield {
+            "recording_id": row.id,
+            "user_id": row.user_id,
+            "store_id": row.store_id,
+            "transcription_id": row.transcription_id,
+            "transcription_text": row.transcription_text,
+            "created_at": row.created_at,
+        }
+
+
+def _ndjson(rows):
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps(row, default=str))
+        if len(buffer) >= EXPORT_BATCH_SIZE:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def _csv(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_export(row_source, export_format, columns, *args):
+    """
+    Encode row_source(db, *args) as NDJSON or CSV chunks, with a session that
+    lives exactly as long as the stream.
+    """
+    db = SessionLocal()
+    try:
+        rows = row_source(db, *args)
+        if export_format == "csv":
+            yield from _csv(rows, columns)
+        else:
+            yield from _ndjson(rows)
+    finally:
+        db.close()
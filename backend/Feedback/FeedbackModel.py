@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Text, DateTime, Float, func
+from sqlalchemy import Column, String, Text, DateTime, Float, func, Index
 from sqlalchemy.orm import declarative_base, relationship
 from backend.schemas.StatusSchema import StatusEnum
 
@@ -19,7 +19,15 @@ class FeedbackModel(Base):
     number = Column(String(36), nullable=False)
     Billed = Column(String(36))
     feedback = Column(Text, nullable=False)
+    call_rating = Column(String(16))  # callRating from the feedback JSON, parsed on write
     created_at = Column(DateTime, default=func.current_timestamp())
     modified_at = Column(
         DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp()
     )
+
+    __table_args__ = (
+        Index("ix_feedback_audio_id", "audio_id"),
+        Index("ix_feedback_user_id_created_at", "user_id", "created_at"),
+        Index("ix_feedback_user_number_created_at", "user_id", "number", "created_at"),
+        Index("ix_feedback_audio_id_call_rating", "audio_id", "call_rating"),
+    )
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
-from backend.Area.AreaModel import L1
 from backend.AudioProcessing.api import parse_dates, parse_timeline
-from backend.State.stateModel import L3
-from backend.User.service import extract_users
-from backend.auth.jwt_handler import verify_token
-from backend.db.db import get_session
+from backend.AudioProcessing.service import recording_filters
+from backend.User.service import resolve_scope_user_ids
+from backend.auth.principal import Principal, get_principal
+from backend.db.db import get_async_session, get_session
 from backend.Feedback.FeedbackModel import FeedbackModel
 from backend.Feedback.FeedbackSchema import FeedbackCreate, FeedbackResponse, Feedback
 from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording
@@ -14,9 +14,15 @@ from backend.User.UserModel import Staff
 import uuid
 from typing import Optional
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 from backend.User.UserModel import User
-from backend.Feedback.service import extract_feedbacks
+from backend.Feedback.service import (
+    call_rating_counts,
+    extract_feedbacks,
+    parse_call_rating,
+    remember_submission,
+    submitted_recently,
+)
 from backend.sales.SalesModel import L2
 from backend.schemas.RoleSchema import RoleEnum
 
@@ -27,13 +33,11 @@ router = APIRouter()
 def create_feedback(
     feedback_data: FeedbackCreate,
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
     try:
         # Authentication check
-        user_id = token.get("user_id")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Unauthorized")
+        user_id = principal.user_id
 
         # Check if audio_id already exists
         existing_audio = (
@@ -80,20 +84,7 @@ def create_feedback(
 
         # If contact number exists, check for recent submissions
         if contact_number:
-            forty_eight_hours_ago = datetime.utcnow() - timedelta(hours=48)
-            recent_feedback = (
-                db.query(FeedbackModel)
-                .filter(
-                    FeedbackModel.user_id == user_id,
-                    FeedbackModel.created_at > forty_eight_hours_ago,
-                    FeedbackModel.feedback.like(
-                        f'%"contact_number":"{contact_number}"%'
-                    ),
-                )
-                .first()
-            )
-
-            if recent_feedback:
+            if submitted_recently(db, user_id, contact_number):
                 raise HTTPException(
                     status_code=400,
                     detail="Feedback with this contact number was submitted recently (within 48 hours)",
@@ -112,11 +103,14 @@ def create_feedback(
             ),
             Billed=feedback_data.Billed,
             number=feedback_data.number,
+            call_rating=parse_call_rating(feedback_json),
         )
 
         db.add(feedback)
         db.commit()
         db.refresh(feedback)
+        if contact_number:
+            remember_submission(user_id, contact_number)
 
         return FeedbackResponse(
             id=feedback.id,
@@ -142,9 +136,9 @@ def create_feedback(
 
 
 @router.get("/list-feedbacks", response_model=List[Feedback])
-def get_all_feedbacks(
-    db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+async def get_all_feedbacks(
+    db: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(get_principal),
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     timeline: Optional[str] = Query(None, description="Timeline e.g. Last 7 days, Last 30 days, Previous month, Last 90 days, Last 365 days, All time"),
@@ -154,15 +148,32 @@ def get_all_feedbacks(
     city_id: Optional[str] = None,
 ):
     # Authentication
-    user_id = token.get("user_id")
-    role_str = token.get("role")
-    if not user_id or role_str is None:
-        raise HTTPException(status_code=401, detail="Unauthorized")
+    return await db.run_sync(
+        _get_all_feedbacks,
+        principal=principal,
+        start_date=start_date,
+        end_date=end_date,
+        timeline=timeline,
+        store_id=store_id,
+        regional_id=regional_id,
+        state_id=state_id,
+        city_id=city_id,
+    )
 
-    try:
-        user_role = RoleEnum(role_str)
-    except ValueError:
-        raise HTTPException(status_code=403, detail="Invalid user role.")
+
+def _get_all_feedbacks(
+    db: Session,
+    principal,
+    start_date,
+    end_date,
+    timeline,
+    store_id,
+    regional_id,
+    state_id,
+    city_id,
+):
+    user_id = principal.user_id
+    user_role = principal.role
 
     # Parse date range or fallback to timeline
     try:
@@ -178,34 +189,21 @@ def get_all_feedbacks(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
-    # Determine downline users based on filters
-    users = []
-
-    if city_id:
-        l1_users = db.query(L1).filter(L1.L1_id == city_id).all()
-        users = [u for l1 in l1_users for u in extract_users(l1.user_id, RoleEnum.L1, db)]
-    elif state_id:
-        l3_users = db.query(L3).filter(L3.L3_id == state_id).all()
-        users = [u for l3 in l3_users for u in extract_users(l3.user_id, RoleEnum.L3, db)]
-    elif regional_id:
+    # Regional filter permissions (city and state filters take precedence)
+    if regional_id and not (city_id or state_id):
         if user_role in [RoleEnum.L0, RoleEnum.L1]:
             raise HTTPException(status_code=403, detail="L0 and L1 users cannot use regional filter.")
-        elif user_role == RoleEnum.L2:
-            region = db.query(L2).filter(L2.L2_id == regional_id).first()
+        region = db.query(L2).filter(L2.L2_id == regional_id).first()
+        if user_role == RoleEnum.L2:
             if not region or region.user_id != user_id:
                 raise HTTPException(status_code=403, detail="L2 users can only access their own region.")
-            regional_user_id = region.user_id
-        else:
-            region = db.query(L2).filter(L2.L2_id == regional_id).first()
-            if not region:
-                raise HTTPException(status_code=404, detail="Invalid regional ID provided.")
-            regional_user_id = region.user_id
-
-        users = extract_users(regional_user_id, RoleEnum.L2, db)
-    else:
-        users = extract_users(user_id, user_role, db)
+        elif not region:
+            raise HTTPException(status_code=404, detail="Invalid regional ID provided.")
 
-    user_ids = [u.user_id for u in users if u]
+    # Determine downline users based on filters
+    user_ids = resolve_scope_user_ids(
+        db, user_id, user_role, city_id=city_id, state_id=state_id, regional_id=regional_id
+    )
 
     # Fetch feedbacks
     feedbacks = extract_feedbacks(
@@ -225,9 +223,9 @@ def get_all_feedbacks(
 
 
 @router.get("/feedback-rating", response_model=dict)
-def get_feedback_rating(
-    db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+async def get_feedback_rating(
+    db: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(get_principal),
     store_id: Optional[str] = None,
     regional_id: Optional[str] = None,
     state_id: Optional[str] = None,
@@ -237,15 +235,32 @@ def get_feedback_rating(
     timeline: Optional[str] = Query(None, description="Timeline e.g. Last 7 days, Last 30 days, Previous month, Last 90 days, Last 365 days, All time")
 ):
     # Authentication check
-    user_id = token.get("user_id")
-    role_str = token.get("role")
-    if not user_id or role_str is None:
-        raise HTTPException(status_code=401, detail="Unauthorized")
+    return await db.run_sync(
+        _get_feedback_rating,
+        principal=principal,
+        store_id=store_id,
+        regional_id=regional_id,
+        state_id=state_id,
+        city_id=city_id,
+        start_date=start_date,
+        end_date=end_date,
+        timeline=timeline,
+    )
 
-    try:
-        user_role = RoleEnum(role_str)
-    except ValueError:
-        raise HTTPException(status_code=403, detail="Invalid role")
+
+def _get_feedback_rating(
+    db: Session,
+    principal,
+    store_id,
+    regional_id,
+    state_id,
+    city_id,
+    start_date,
+    end_date,
+    timeline,
+):
+    user_id = principal.user_id
+    user_role = principal.role
 
     # Parse date range or fallback to timeline
     try:
@@ -261,82 +276,33 @@ def get_feedback_rating(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
-    # Determine downline users based on filters
-    users = []
-
-    if city_id:
-        l1_users = db.query(L1).filter(L1.L1_id == city_id).all()
-        users = [u for l1 in l1_users for u in extract_users(l1.user_id, RoleEnum.L1, db)]
-    elif state_id:
-        l3_users = db.query(L3).filter(L3.L3_id == state_id).all()
-        users = [u for l3 in l3_users for u in extract_users(l3.user_id, RoleEnum.L3, db)]
-    elif regional_id:
+    # Regional filter permissions (city and state filters take precedence)
+    if regional_id and not (city_id or state_id):
         if user_role in [RoleEnum.L0, RoleEnum.L1]:
             raise HTTPException(status_code=403, detail="L0 and L1 users cannot use regional filter.")
-        elif user_role == RoleEnum.L2:
-            region = db.query(L2).filter(L2.L2_id == regional_id).first()
+        region = db.query(L2).filter(L2.L2_id == regional_id).first()
+        if user_role == RoleEnum.L2:
             if not region or region.user_id != user_id:
                 raise HTTPException(status_code=403, detail="L2 users can only access their own region.")
-            regional_user_id = region.user_id
-        else:
-            region = db.query(L2).filter(L2.L2_id == regional_id).first()
-            if not region:
-                raise HTTPException(status_code=404, detail="Invalid regional ID provided.")
-            regional_user_id = region.user_id
-
-        users = extract_users(regional_user_id, RoleEnum.L2, db)
-    else:
-        users = extract_users(user_id, user_role, db)
-
-    user_ids = [u.user_id for u in users]
-
-    # Fetch voice recordings
-    query = db.query(VoiceRecording).filter(
-        VoiceRecording.user_id.in_(user_ids),
-        VoiceRecording.created_at >= start_date_obj,
-        VoiceRecording.created_at <= end_date_obj,
+        elif not region:
+            raise HTTPException(status_code=404, detail="Invalid regional ID provided.")
+
+    # Determine downline users based on filters
+    user_ids = resolve_scope_user_ids(
+        db, user_id, user_role, city_id=city_id, state_id=state_id, regional_id=regional_id
     )
 
-    if store_id:
-        query = query.filter(VoiceRecording.store_id == store_id)
-
-    voice_recordings = query.all()
-
-    if not voice_recordings:
-        return {
-            "requested_by": user_id if user_role != RoleEnum.L4 else "Super Admin",
-            "total_feedbacks": 0,
-            "positive_feedbacks": 0,
-            "negative_feedbacks": 0,
-            "average_feedbacks": 0,
-        }
-
-    audio_ids = [rec.id for rec in voice_recordings]
-    feedbacks = db.query(FeedbackModel).filter(
-        FeedbackModel.audio_id.in_(audio_ids),
-        FeedbackModel.created_at >= start_date_obj,
-        FeedbackModel.created_at <= end_date_obj,
-    ).all()
-
-    positive_feedbacks = negative_feedbacks = average_feedbacks = 0
-
-    for feedback in feedbacks:
-        try:
-            feedback_data = json.loads(feedback.feedback)
-            call_rating = feedback_data.get("callRating", "").lower()
-            if call_rating == "good":
-                positive_feedbacks += 1
-            elif call_rating == "bad":
-                negative_feedbacks += 1
-            elif call_rating == "average":
-                average_feedbacks += 1
-        except json.JSONDecodeError:
-            continue
+    counts = call_rating_counts(
+        db,
+        recording_filters(user_ids, start_date_obj, end_date_obj, store_id),
+        start_date_obj,
+        end_date_obj,
+    )
 
     return {
         "requested_by": user_id if user_role != RoleEnum.L4 else "Super Admin",
-        "total_feedbacks": len(feedbacks),
-        "positive_feedbacks": positive_feedbacks,
-        "negative_feedbacks": negative_feedbacks,
-        "average_feedbacks": average_feedbacks,
+        "total_feedbacks": sum(counts.values()),
+        "positive_feedbacks": counts.get("good", 0),
+        "negative_feedbacks": counts.get("bad", 0),
+        "average_feedbacks": counts.get("average", 0),
     }
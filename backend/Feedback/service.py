@@ -1,14 +1,84 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func
 from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording
+from backend.cache import Cache, MemoryBackend
+from backend.config import TenantSettings
 from backend.Feedback.FeedbackModel import FeedbackModel
 from backend.Feedback.FeedbackSchema import Feedback
 from backend.User.UserModel import Staff
-from backend.User.service import extract_users
+from backend.User.service import resolve_user_ids
+
+settings = TenantSettings()
+
+# a contact number gets one feedback per user in this window
+FEEDBACK_DEDUPE_WINDOW = timedelta(hours=48)
+# (user_id, number) pairs submitted lately, so a resubmit skips the database
+recent_submissions = Cache(
+    "feedback_recent_numbers",
+    MemoryBackend(
+        maxsize=settings.FEEDBACK_RECENT_CACHE_SIZE,
+        ttl=min(settings.FEEDBACK_RECENT_CACHE_TTL, FEEDBACK_DEDUPE_WINDOW.total_seconds()),
+    ),
+)
+
+
+CALL_RATINGS = ("good", "average", "bad")
+
+
+def parse_call_rating(feedback_json):
+    """Normalised callRating of a feedback payload, None when missing or unknown."""
+    if not isinstance(feedback_json, dict):
+        return None
+    rating = feedback_json.get("callRating")
+    if not isinstance(rating, str):
+        return None
+    rating = rating.strip().lower()
+    return rating if rating in CALL_RATINGS else None
+
+
+def call_rating_counts(db, scope_filters, start_date, end_date):
+    """Feedback count per call_rating (None for unrated) on the recordings matching scope_filters."""
+    rows = (
+        db.query(FeedbackModel.call_rating, func.count())
+        .join(VoiceRecording, VoiceRecording.id == FeedbackModel.audio_id)
+        .filter(
+            *scope_filters,
+            FeedbackModel.created_at >= start_date,
+            FeedbackModel.created_at <= end_date,
+        )
+        .group_by(FeedbackModel.call_rating)
+        .all()
+    )
+    return {rating: count for rating, count in rows}
+
+
+def submitted_recently(db, user_id, number):
+    """
+    True if user_id sent feedback for this contact number within the dedupe window.
+    Only remember_submission fills the cache: an entry lives for the cache TTL,
+    which could outlast the window left on an older row found here.
+    """
+    if recent_submissions.get((user_id, number)):
+        return True
+    recent = (
+        db.query(FeedbackModel.id)
+        .filter(
+            FeedbackModel.user_id == user_id,
+            FeedbackModel.number == number,
+            FeedbackModel.created_at > datetime.utcnow() - FEEDBACK_DEDUPE_WINDOW,
+        )
+        .first()
+    )
+    return recent is not None
+
+
+def remember_submission(user_id, number):
+    recent_submissions.set((user_id, number), True)
 
 
 def extract_feedbacks(db, user_id, role, start_date, end_date, store_id=None, user_ids=None):
     if user_ids is None:
-        users = extract_users(user_id, role, db)
-        user_ids = [user.user_id for user in users]
+        user_ids = resolve_user_ids(user_id, role, db)
 
     # Build base query
     query = (
@@ -1,39 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from backend.db.db import get_session
+from backend.db.db import get_async_session
 from backend.User.UserModel import User
 from backend.Login.LoginSchema import LoginSchema
 from backend.auth.jwt_handler import create_access_token
-from passlib.context import CryptContext
+from backend.auth.login_limiter import email_limiter, ip_limiter, normalize_email, unknown_email_cache
+from backend.auth.passwords import verify_and_update
 from datetime import datetime
 
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+@router.post("/login")
+async def login_user(
+    user_data: LoginSchema,
+    request: Request,
+    db: AsyncSession = Depends(get_async_session),
+):
+    email_key = normalize_email(user_data.email)
+    ip_key = request.client.host if request.client else "unknown"
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    # Throttle before any database or bcrypt work. The slot is taken up front so
+    # concurrent attempts for one email cannot all get past the limit.
+    retry_after = ip_limiter.acquire(ip_key) or email_limiter.acquire(email_key)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
 
+    if unknown_email_cache.get(email_key):
+        raise HTTPException(status_code=400, detail="Invalid email")
 
-@router.post("/login")
-def login_user(user_data: LoginSchema, db: Session = Depends(get_session)):
-    user = db.query(User).filter(User.email_id == user_data.email).first()
+    # same key as the negative cache, so a differently cased or padded attempt
+    # cannot mark a real account unknown
+    result = await db.execute(select(User).where(User.email_id == email_key))
+    user = result.scalars().first()
     if not user:
+        unknown_email_cache.set(email_key, True)
         raise HTTPException(status_code=400, detail="Invalid email")
-    if not verify_password(user_data.password, user.password):
+    valid, new_hash = await verify_and_update(user_data.password, user.password)
+    if not valid:
         raise HTTPException(status_code=400, detail="Invalid password")
+    email_limiter.reset(email_key)
+    ip_limiter.release(ip_key)
+    if new_hash:
+        # stored with an outdated bcrypt cost
+        user.password = new_hash
 
     access_token = create_access_token(
-        data={"sub": user.email_id, "role": user.role, "user_id": user.user_id},
+        data={
+            "sub": user.email_id,
+            "role": user.role,
+            "user_id": user.user_id,
+            "business_id": user.business_id,
+        },
         expires_delta=timedelta(minutes=480),
     )
 
     user.last_login = datetime.utcnow()
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return {
         "user_id": user.user_id,
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording
+from backend.AudioProcessing.rollup import rollup_filters, rollup_totals
 from backend.Feedback.FeedbackModel import FeedbackModel
 from backend.Store.StoreModel import L0
 from backend.Store.StoreSchema import (
@@ -15,13 +16,13 @@ from backend.Store.StoreSchema import (
 )
 from typing import List, Optional
 from backend.Area.AreaModel import L1
-from backend.User.service import extract_users
+from backend.User.service import resolve_scope_user_ids
 from backend.db.db import get_session
 from typing_extensions import Annotated
 from backend.sales.SalesModel import L2
 from backend.schemas.RoleSchema import RoleEnum
 from backend.auth.role_checker import check_role
-from backend.auth.jwt_handler import verify_token
+from backend.auth.principal import Principal, get_principal
 from sqlalchemy.exc import SQLAlchemyError
 from backend.User.UserModel import User
 from backend.Store.service import extract_stores
@@ -34,13 +35,13 @@ router = APIRouter()
 def create_store(
     store: StoreCreate,
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
     db_store = L0(
         L0_name=store.store_name,
         L0_code=store.store_code,
         L0_addr=store.store_address,
-        user_id=token.get("user_id"),  # Extracting user_id from token
+        user_id=principal.user_id,  # Extracting user_id from token
         status=store.store_status,
     )
 
@@ -63,18 +64,16 @@ def create_store(
 # @check_role([RoleEnum.L1, RoleEnum.L2, RoleEnum.L3, RoleEnum.L4])
 def read_stores(
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
-    user_id = token.get("user_id")
-    user_role = token.get("role")
-    
-    # Get business_id from the database instead of using a class attribute
-    user = db.query(User.business_id).filter(User.user_id == user_id).first()
-    if not user:
+    user_id = principal.user_id
+    user_role = principal.role
+
+    # the token can outlive the user; a primary-key lookup is enough to tell
+    if not db.query(User.user_id).filter(User.user_id == user_id).first():
         raise HTTPException(status_code=404, detail="User not found")
-    business_id = user.business_id
 
-    stores = extract_stores(business_id, user_id, user_role, db)
+    stores = extract_stores(principal.business_id, user_id, user_role, db)
 
     return [
         StoreSummary(
@@ -95,15 +94,10 @@ def read_stores(
 def get_store_region(
     region_id: Optional[str] = Query(None, description="Regional ID"),
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
-    user_id = token.get("user_id")
-    role = token.get("role")
-
-    if user_id is None or role is None:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-
-    role_enum = RoleEnum(role)
+    user_id = principal.user_id
+    role_enum = principal.role
 
     if role_enum == RoleEnum.L2:
         l2 = db.query(L2).filter(L2.user_id == user_id).first()
@@ -112,23 +106,16 @@ def get_store_region(
         region_id = l2.L2_id
 
     if region_id:
-        l2 = db.query(L2).filter(L2.L2_id == region_id).first()
-        if not l2:
+        if not db.query(L2.L2_id).filter(L2.L2_id == region_id).first():
             raise HTTPException(status_code=404, detail="Region not found.")
-        l2_user_id = l2.user_id
-        downline_users = extract_users(l2_user_id, RoleEnum.L2, db)
+        user_ids = resolve_scope_user_ids(db, user_id, role_enum, regional_id=region_id)
     else:
-        downline_users = extract_users(user_id, role_enum, db)
+        user_ids = resolve_scope_user_ids(db, user_id, role_enum)
 
-    seen = set()
-    users = []
-    for user in downline_users:
-        if user.user_id not in seen:
-            seen.add(user.user_id)
-            users.append(user)
-
-    user_ids = [user.user_id for user in users]
-    user_emails = [user.email_id for user in users]
+    user_emails = [
+        user.email_id
+        for user in db.query(User.email_id).filter(User.user_id.in_(user_ids)).all()
+    ]
 
     stores = (
         db.query(L0.L0_name)
@@ -138,17 +125,10 @@ def get_store_region(
     )
     store_names = [store.L0_name for store in stores]
 
-    total_seconds = db.query(func.sum(VoiceRecording.call_duration)).filter(
-        VoiceRecording.user_id.in_(user_ids)
-    ).scalar() or 0
-
-    total_recordings = db.query(func.count(VoiceRecording.id)).filter(
-        VoiceRecording.user_id.in_(user_ids)
-    ).scalar() or 0
-
-    avg_duration = db.query(func.avg(VoiceRecording.call_duration)).filter(
-        VoiceRecording.user_id.in_(user_ids)
-    ).scalar()
+    totals = rollup_totals(db, rollup_filters(user_ids))
+    total_seconds = totals["duration_sum"]
+    total_recordings = totals["recording_count"]
+    avg_duration = total_seconds / total_recordings if total_recordings else None
 
     audio_ids = db.query(VoiceRecording.id).filter(
         VoiceRecording.user_id.in_(user_ids)
@@ -172,17 +152,10 @@ def edit_store(
     L0_id: str,
     store_update: StoreUpdateSchema,
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
     try:
-        token_user_id = token.get("user_id")
-        if not token_user_id:
-            raise HTTPException(status_code=401, detail="Authentication required")
-
-        try:
-            user_role = RoleEnum(token.get("role", ""))
-        except ValueError:
-            raise HTTPException(status_code=403, detail="Invalid user role")
+        user_role = principal.role
 
         if user_role != RoleEnum.L4:
             raise HTTPException(
@@ -239,7 +212,7 @@ def edit_store(
 def delete_store(
     L0_id: str,
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
     try:
         store = (
@@ -1,5 +1,5 @@
 from backend.Store.StoreModel import L0
-from backend.User.service import extract_users, get_user_ids_by_hierarchy
+from backend.User.service import get_user_ids_by_hierarchy
 
 
 def extract_stores(business_id, user_id, role, db):
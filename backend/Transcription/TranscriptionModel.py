@@ -1,7 +1,8 @@
 import uuid
-from sqlalchemy import Column, String, Text, DateTime, func, JSON
+from sqlalchemy import Column, String, Text, DateTime, Integer, BigInteger, func, JSON, Index, Enum
 from sqlalchemy.orm import declarative_base, relationship
 from backend.schemas.StatusSchema import StatusEnum
+from backend.schemas.TranscriptionSchema import TransctriptionStatus
 
 Base = declarative_base()
 
@@ -18,7 +19,9 @@ class Transcription(Base):
     transcription_text = Column(Text, nullable=False)
     AI_analytics_id = Column(String(36), nullable=True)
     ML_analytics_id = Column(String(36), nullable=True)
-    
+
+    __table_args__ = (Index("ix_transcription_audio_id", "audio_id"),)
+
 
 class TranscribeAI(Base):
     __tablename__ = "transcribe_ai"
@@ -40,6 +43,52 @@ class TranscribeAI(Base):
         DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp()
     )
 
+    __table_args__ = (
+        Index("ix_transcribe_ai_audio_id", "audio_id"),
+        Index("ix_transcribe_ai_language_gender", "audio_id", "language", "gender"),
+    )
+
+class TranscriptionJob(Base):
+    __tablename__ = "transcription_job"
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    recording_id = Column(String(36), nullable=False)
+    source_path = Column(Text, nullable=True)  # local copy of the upload, if one was kept
+    status = Column(Enum(TransctriptionStatus), nullable=False, default=TransctriptionStatus.pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=func.current_timestamp())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    modified_at = Column(
+        DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp()
+    )
+
+    __table_args__ = (
+        Index("ix_transcription_job_status_created_at", "status", "created_at"),
+        Index("ix_transcription_job_recording_id", "recording_id"),
+    )
+
+
+class TranscribeAITerm(Base):
+    """One row per term occurrence in a TranscribeAI JSON list, for grouped counting."""
+
+    __tablename__ = "transcribe_ai_term"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    transcribe_ai_id = Column(String(36), nullable=False)
+    audio_id = Column(String(36), nullable=False)
+    facet = Column(String(32), nullable=False)
+    term = Column(String(255), nullable=False)
+    created_at = Column(DateTime, default=func.current_timestamp())
+
+    __table_args__ = (
+        Index("ix_transcribe_ai_term_audio_facet_term", "audio_id", "facet", "term"),
+        Index("ix_transcribe_ai_term_facet_created_at", "facet", "created_at"),
+        Index("ix_transcribe_ai_term_transcribe_ai_id", "transcribe_ai_id"),
+    )
+
+
 TranscribeAI._language = TranscribeAI.__table__.c.language
 @property
 def language(self):
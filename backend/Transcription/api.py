@@ -2,104 +2,37 @@ from fastapi import HTTPException, BackgroundTasks, Query
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from backend.AudioProcessing.api import parse_dates, parse_timeline
-from backend.AudioProcessing.service import extract_recordings
-from backend.Transcription.service import transcribe_audio
+from backend.AudioProcessing.service import recording_filters, recording_status_breakdown
+from backend.Transcription.worker import enqueue_transcription
+from backend.Transcription.terms import term_counts, value_counts
+from backend.Transcription.wordclouds import start_word_cloud, word_cloud_status, word_cloud_url
 from backend.db.db import get_session
-from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording
-from backend.Transcription.TranscriptionModel import Transcription, TranscribeAI
-from backend.schemas.TranscriptionSchema import TransctriptionStatus
-from sqlalchemy import func, desc
+from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording, RecordingDailyRollup
+from backend.AudioProcessing.rollup import rollup_filters, rollup_transcription_counts
+from backend.Transcription.TranscriptionModel import Transcription, TranscribeAI, TranscriptionJob
+from backend.schemas.TranscriptionSchema import (
+    RecordingTranscriptionResponse,
+    TransctriptionStatus,
+    TranscriptionJobResponse,
+)
+from sqlalchemy import func, desc, case, select
 from typing import List, Dict, Any, Optional
 import json
-import os
-from wordcloud import WordCloud
-import boto3
-from botocore.client import Config
-import matplotlib.pyplot as plt
-from collections import Counter
+import re
 from backend.User.UserModel import User
-from backend.Area.AreaModel import L1
 from backend.sales.SalesModel import L2
-from backend.State.stateModel import L3 
 from collections import Counter
-from backend.auth.jwt_handler import verify_token
+from backend.auth.principal import Principal, get_principal
 from backend.auth.role_checker import check_role
 from backend.schemas.RoleSchema import RoleEnum
 from backend.Feedback.FeedbackModel import FeedbackModel
 from datetime import datetime, timedelta
-from backend.User.service import extract_users
+from backend.User.service import resolve_scope_user_ids
 from backend.config import TenantSettings
 
 router = APIRouter()
 settings = TenantSettings()
-STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
-POSITIVE_WORD_CLOUD_PATH = os.path.join(STATIC_DIR, "positive_word_cloud.png")
-NEGATIVE_WORD_CLOUD_PATH = os.path.join(STATIC_DIR, "negative_word_cloud.png")
-
-os.makedirs(STATIC_DIR, exist_ok=True)
 
-def generate_word_cloud(words, output_path, title="Word Cloud"):
-    """
-    Generate a word cloud from a list of words and save it to the specified path.
-    """
-    if not words:
-        plt.figure(figsize=(10, 6))
-        plt.text(0.5, 0.5, "No data available", 
-                 horizontalalignment='center', 
-                 verticalalignment='center',
-                 fontsize=16)
-        plt.axis('off')
-        plt.savefig(output_path)
-        plt.close()
-        return
-    
-    wordcloud = WordCloud(
-        width=800, 
-        height=400, 
-        background_color='white',
-        max_words=100,
-        contour_width=3,
-        contour_color='steelblue'
-    ).generate_from_frequencies(dict(Counter(words)))
-    
-    plt.figure(figsize=(10, 6))
-    plt.imshow(wordcloud, interpolation='bilinear')
-    plt.axis('off')
-    plt.title(title, fontsize=16)
-    
-    plt.savefig(output_path)
-    plt.close()
-    S3_access_key = settings.S3_ACCESS_KEY
-    S3_access_secret = settings.S3_SECRET_KEY
-    S3_bucket_name = settings.S3_BUCKET_NAME
-    S3_EndPoint = settings.S3_ENDPOINT
-    S3_CDN = settings.S3_CDN
-
-    client_s3 = boto3.client(
-        "s3",
-        endpoint_url=S3_EndPoint,
-        aws_access_key_id=S3_access_key,
-        aws_secret_access_key=S3_access_secret,
-        config=Config(signature_version="s3v4", region_name="auto"),
-    )
-    with open(output_path, "rb") as data:
-        # Ensure pointer is at the beginning
-        data.seek(0)
-
-        current_datetime = datetime.now()
-        formatted_datetime = (
-            current_datetime.strftime("%Y%m%d%H%M%S%f") + "." + "png")
-        
-
-        # Upload to S3
-        client_s3.upload_fileobj(
-            data,
-            S3_bucket_name,
-            f"wordcloud/{formatted_datetime}",
-            ExtraArgs={"ContentType": "image/png"},
-        )
-    url = f"{S3_CDN}/wordcloud/{formatted_datetime}"
-    return url
 
 @router.post("/on-demnad-transcription")
 @check_role([RoleEnum.L1, RoleEnum.L2, RoleEnum.L3, RoleEnum.L4])
@@ -107,22 +40,17 @@ def start_transcription(
     recording_id: str,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
-    user_id = token.get("user_id")
-    role_str = token.get("role")
-
-    try:
-        user_role = RoleEnum(role_str)
-    except ValueError:
-        raise HTTPException(status_code=403, detail="Invalid user role")
+    user_id = principal.user_id
+    user_role = principal.role
 
     recording = db.query(VoiceRecording).filter(VoiceRecording.id == recording_id).first()
     if not recording:
         raise HTTPException(status_code=404, detail="Recording not found")
 
     # Get all allowed user_ids for the current user based on hierarchy
-    allowed_users = [u.user_id for u in extract_users(user_id, user_role, db)]
+    allowed_users = resolve_scope_user_ids(db, user_id, user_role)
 
     # Add self to allowed list
     allowed_users.append(user_id)
@@ -134,24 +62,104 @@ def start_transcription(
     if recording.transcription_status != TransctriptionStatus.pending:
         return {"error": "Transcription already in progress or completed"}
 
-    transcribe_audio(recording_id, db)
-
-    # Fetch transcription_id created in TranscribeAI for the recording
-    transcribe_record = db.query(TranscribeAI).filter(TranscribeAI.audio_id == recording_id).first()
-
-    if not transcribe_record:
-        return {"error": "Transcription failed or not recorded"}
+    job = enqueue_transcription(db, recording_id)
 
     return {
-        "Status": "transcription started successfully",
-        "Transcription_id": str(transcribe_record.id)
+        "Status": "transcription queued",
+        "Job_id": job.id,
     }
 
+
+@router.get("/get-transcription/{recording_id}", response_model=RecordingTranscriptionResponse)
+@check_role([RoleEnum.L1, RoleEnum.L2, RoleEnum.L3, RoleEnum.L4])
+def get_recording_transcription(
+    recording_id: str,
+    db: Session = Depends(get_session),
+    principal: Principal = Depends(get_principal),
+):
+    user_id = principal.user_id
+    user_role = principal.role
+
+    recording = (
+        db.query(VoiceRecording.user_id, VoiceRecording.transcription_status)
+        .filter(VoiceRecording.id == recording_id)
+        .first()
+    )
+    if not recording:
+        raise HTTPException(status_code=404, detail="Recording not found")
+
+    allowed_users = resolve_scope_user_ids(db, user_id, user_role)
+    allowed_users.append(user_id)
+    if recording.user_id not in allowed_users:
+        raise HTTPException(status_code=403, detail="You are not authorized to view this recording")
+
+    transcription = (
+        db.query(Transcription.id, Transcription.transcription_text)
+        .filter(Transcription.audio_id == recording_id)
+        .first()
+    )
+    return RecordingTranscriptionResponse(
+        recording_id=recording_id,
+        transcription_status=recording.transcription_status or TransctriptionStatus.pending,
+        transcription_id=transcription.id if transcription else None,
+        transcription_text=transcription.transcription_text if transcription else None,
+    )
+
+
+@router.get("/transcription-job/{job_id}", response_model=TranscriptionJobResponse)
+def get_transcription_job(
+    job_id: str,
+    db: Session = Depends(get_session),
+    principal: Principal = Depends(get_principal),
+):
+    job = db.query(TranscriptionJob).filter(TranscriptionJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Transcription job not found")
+
+    recording = db.query(VoiceRecording.user_id).filter(VoiceRecording.id == job.recording_id).first()
+    if not recording:
+        raise HTTPException(status_code=404, detail="Transcription job not found")
+
+    allowed_users = resolve_scope_user_ids(db, principal.user_id, principal.role)
+    allowed_users.append(principal.user_id)
+    if recording.user_id not in allowed_users:
+        raise HTTPException(status_code=403, detail="You are not authorized to view this transcription job")
+
+    transcription_id = None
+    if job.status == TransctriptionStatus.completed:
+        transcribe_record = (
+            db.query(TranscribeAI.id).filter(TranscribeAI.audio_id == job.recording_id).first()
+        )
+        transcription_id = transcribe_record.id if transcribe_record else None
+
+    return TranscriptionJobResponse(
+        job_id=job.id,
+        recording_id=job.recording_id,
+        status=job.status,
+        attempts=job.attempts,
+        error=job.error,
+        transcription_id=transcription_id,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.get("/word-cloud/{word_cloud_id}")
+def get_word_cloud(
+    word_cloud_id: str,
+    principal: Principal = Depends(get_principal),
+):
+    if not re.fullmatch(r"[0-9a-f]{64}", word_cloud_id):
+        raise HTTPException(status_code=400, detail="Invalid word cloud id")
+    return word_cloud_status(word_cloud_id)
+
+
 @router.get("/get-transcription-analytics")
 @check_role([RoleEnum.L1, RoleEnum.L2, RoleEnum.L3, RoleEnum.L4])
 def get_transcription_analytics(
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     store_id: Optional[str] = None,
@@ -159,13 +167,11 @@ def get_transcription_analytics(
     state_id: Optional[str] = None,
     city_id: Optional[str] = None,
     timeline: Optional[str] = Query(None, description="Timeline e.g. Last 7 days, Last 30 days, Previous month, Last 90 days, Last 365 days, All time"),
+    async_images: bool = Query(False, description="Return word cloud ids at once and poll /word-cloud/{id} for the urls"),
 ):
     try:
-        user_id = token.get("user_id")
-        role_str = token.get("role")
-        if not user_id or not role_str:
-            raise HTTPException(status_code=401, detail="Unauthorized")
-        user_role = RoleEnum(role_str)
+        user_id = principal.user_id
+        user_role = principal.role
 
         start_date_obj, end_date_obj = parse_dates(start_date, end_date)
 
@@ -189,95 +195,46 @@ def get_transcription_analytics(
         if regional_id:
             if user_role in [RoleEnum.L0, RoleEnum.L1]:
                 raise HTTPException(status_code=403, detail="L0 and L1 users cannot filter by regional ID.")
-            elif user_role == RoleEnum.L2:
-                l2_region = db.query(L2).filter(L2.L2_id == regional_id).first()
+            l2_region = db.query(L2).filter(L2.L2_id == regional_id).first()
+            if user_role == RoleEnum.L2:
                 if not l2_region or l2_region.user_id != user_id:
                     raise HTTPException(status_code=403, detail="L2 users can only access their own region.")
-                regional_user_id = l2_region.user_id
-            else:
-                l2_region = db.query(L2).filter(L2.L2_id == regional_id).first()
-                if not l2_region:
-                    raise HTTPException(status_code=404, detail="Invalid regional ID provided.")
-                regional_user_id = l2_region.user_id
-            downline_user_ids = [u.user_id for u in extract_users(regional_user_id, RoleEnum.L2, db)]
-        else:
-            downline_user_ids = [u.user_id for u in extract_users(user_id, user_role, db)]
-
-        # Filter by state_id and city_id if provided
-        if state_id:
-            downline_user_ids = [
-                u.user_id for u in extract_users(user_id, user_role, db) if u.state_id == state_id
-            ]
-        if city_id:
-            downline_user_ids = [
-                u.user_id for u in extract_users(user_id, user_role, db) if u.city_id == city_id
-            ]
-
-        # Recordings
-        recordings = extract_recordings(
-            db, user_id, user_role,
-            start_date=start_date_obj,
-            end_date=end_date_obj,
-            store_id=store_id,
-            user_ids=downline_user_ids
+            elif not l2_region:
+                raise HTTPException(status_code=404, detail="Invalid regional ID provided.")
+
+        # City narrows further than state, state further than region
+        downline_user_ids = resolve_scope_user_ids(
+            db, user_id, user_role, city_id=city_id, state_id=state_id, regional_id=regional_id
         )
-        recording_ids = [rec.id for rec in recordings]
-        total_transcriptions = len(recording_ids)
+
+        # The scope stays in SQL: counts filter on it directly and the other
+        # queries use the matching recording ids as a subquery
+        scope_filters = recording_filters(downline_user_ids, start_date_obj, end_date_obj, store_id)
+        recording_ids = select(VoiceRecording.id).where(*scope_filters)
 
         # Transcription stats
-        on_demand_transcriptions = db.query(VoiceRecording).filter(
-            VoiceRecording.id.in_(recording_ids),
-            VoiceRecording.transcription_status == TransctriptionStatus.completed,
-            VoiceRecording.call_duration < 300
-        ).count()
-        failed_transcriptions = db.query(VoiceRecording).filter(
-            VoiceRecording.id.in_(recording_ids),
-            VoiceRecording.transcription_status == TransctriptionStatus.failure
-        ).count()
-        pending_transcriptions = db.query(VoiceRecording).filter(
-            VoiceRecording.id.in_(recording_ids),
-            VoiceRecording.transcription_status == TransctriptionStatus.pending
-        ).count()
-        finished_transcriptions = db.query(VoiceRecording).filter(
-            VoiceRecording.id.in_(recording_ids),
-            VoiceRecording.transcription_status == TransctriptionStatus.completed
-        ).count()
-
-        # TranscribeAI data
-        transcribe_ai_data = db.query(TranscribeAI).filter(
-            TranscribeAI.audio_id.in_(recording_ids)
-        ).all()
-
-        # Counters
-        emotion_counter = Counter()
-        product_counter = Counter()
-        complaint_counter = Counter()
-        contact_reason_counter = Counter()
-        category_interest_counter = Counter()
-        language_counter = Counter()
-        gender_counter = Counter()
-        all_positive_keywords = []
-        all_negative_keywords = []
-
-        for ai in transcribe_ai_data:
-            if ai.emotional_state:
-                emotion_counter.update(ai.emotional_state)
-            if ai.product_mentions:
-                product_counter.update(ai.product_mentions)
-            if ai.complaints:
-                complaint_counter.update(ai.complaints)
-            if ai.contact_reason:
-                contact_reason_counter.update(ai.contact_reason)
-            if ai.customer_interest:
-                category_interest_counter.update(ai.customer_interest)
-            if ai.language and ai.language != "unknown":
-                language_counter.update([ai.language])
-            if ai.gender and ai.gender != "unknown":
-                gender_counter.update([ai.gender])
-            if ai.positive_keywords:
-                all_positive_keywords.extend(ai.positive_keywords)
-            if ai.negative_keywords:
-                all_negative_keywords.extend(ai.negative_keywords)
+        breakdown = recording_status_breakdown(db, scope_filters)
+        total_transcriptions = breakdown["total"]
+        on_demand_transcriptions = breakdown["on_demand"]
+        failed_transcriptions = breakdown["failed"]
+        pending_transcriptions = breakdown["pending"]
+        finished_transcriptions = breakdown["completed"]
+
+        # Facet counts, grouped in the database from transcribe_ai_term
+        emotion_counter = term_counts(db, "emotion", recording_ids, limit=5)
+        product_counter = term_counts(db, "product", recording_ids, limit=5)
+        complaint_counter = term_counts(db, "complaint", recording_ids, limit=5)
+        contact_reason_counter = term_counts(db, "reason", recording_ids, limit=5)
+        category_interest_counter = term_counts(db, "interest", recording_ids, limit=5)
+        language_counter = value_counts(db, TranscribeAI._language, recording_ids, limit=5)
+        gender_counter = value_counts(db, TranscribeAI.gender, recording_ids)
+        positive_frequencies = term_counts(db, "positive", recording_ids)
+        negative_frequencies = term_counts(db, "negative", recording_ids)
+        first_analysis = (
+            db.query(TranscribeAI.created_at, TranscribeAI.modified_at)
+            .filter(TranscribeAI.audio_id.in_(recording_ids))
+            .first()
+        )
 
         def format_percent_object(counter: Counter, top_n=5) -> dict:
             if not counter:
@@ -295,17 +252,31 @@ def get_transcription_analytics(
 
             return {k: {"count": v, "percentage": p} for k, v, p in percentages}
 
-        PositiveUrl = generate_word_cloud(all_positive_keywords, POSITIVE_WORD_CLOUD_PATH, "Positive Keywords")
-        NegativeUrl = generate_word_cloud(all_negative_keywords, NEGATIVE_WORD_CLOUD_PATH, "Negative Keywords")
+        if async_images:
+            PositiveId, PositiveUrl = start_word_cloud(positive_frequencies)
+            NegativeId, NegativeUrl = start_word_cloud(negative_frequencies)
+        else:
+            PositiveUrl = word_cloud_url(positive_frequencies)
+            NegativeUrl = word_cloud_url(negative_frequencies)
 
         # Audience Demographics
-        feedback_records = db.query(FeedbackModel).filter(
-            FeedbackModel.audio_id.in_(recording_ids)
-        ).all()
-        phone_number_counter = Counter([f.number for f in feedback_records if f.number])
+        number_counts = (
+            db.query(FeedbackModel.number, func.count().label("calls"))
+            .filter(
+                FeedbackModel.audio_id.in_(recording_ids),
+                FeedbackModel.number.isnot(None),
+                FeedbackModel.number != "",
+            )
+            .group_by(FeedbackModel.number)
+            .subquery()
+        )
         frequent_threshold = 1
-        frequent_numbers = sum(1 for count in phone_number_counter.values() if count > frequent_threshold)
-        new_numbers = sum(1 for count in phone_number_counter.values() if count <= frequent_threshold)
+        audience = db.query(
+            func.coalesce(func.sum(case((number_counts.c.calls > frequent_threshold, 1), else_=0)), 0).label("frequent"),
+            func.count().label("total"),
+        ).one()
+        frequent_numbers = int(audience.frequent)
+        new_numbers = int(audience.total) - frequent_numbers
         total_numbers = frequent_numbers + new_numbers
         audience_str = (
             f"existing:{round((frequent_numbers / total_numbers) * 100)}%,new:{round((new_numbers / total_numbers) * 100)}%"
@@ -335,9 +306,12 @@ def get_transcription_analytics(
             "Category_interest": format_percent_object(category_interest_counter),
             "Word_cloud_positive": PositiveUrl,
             "Word_cloud_negative": NegativeUrl,
-            "Created_at": transcribe_ai_data[0].created_at if transcribe_ai_data else None,
-            "Modified_at": transcribe_ai_data[0].modified_at if transcribe_ai_data else None,
+            "Created_at": first_analysis.created_at if first_analysis else None,
+            "Modified_at": first_analysis.modified_at if first_analysis else None,
         }
+        if async_images:
+            response["Word_cloud_positive_id"] = PositiveId
+            response["Word_cloud_negative_id"] = NegativeId
 
         return response
 
@@ -345,6 +319,39 @@ def get_transcription_analytics(
         raise HTTPException(status_code=500, detail=f"Error fetching transcription analytics: {str(e)}")
 
 
+CHART_BUCKETS = ("day", "week", "month")
+
+
+def bucket_expression(column, bucket):
+    """SQL expression for the first day of the bucket containing column."""
+    if bucket == "week":
+        return func.subdate(func.date(column), func.weekday(column))
+    if bucket == "month":
+        return func.date_format(column, "%Y-%m-01")
+    return func.date(column)
+
+
+def bucket_start(day, bucket):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_series(start, end, bucket):
+    """Start dates of every bucket between start and end, inclusive."""
+    current = bucket_start(start, bucket)
+    while current <= end:
+        yield current
+        if bucket == "week":
+            current += timedelta(days=7)
+        elif bucket == "month":
+            current = (current + timedelta(days=32)).replace(day=1)
+        else:
+            current += timedelta(days=1)
+
+
 @router.get("/transcriptions-chart")
 def get_transcriptions_chart(
     store_id: Optional[str] = Query(None, description="Store ID to filter by"),
@@ -354,20 +361,20 @@ def get_transcriptions_chart(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     timeline: Optional[str] = Query(None, description="Timeline e.g. Last 7 days, Last 30 days, Previous month, Last 90 days, Last 365 days, All time"),
+    bucket: str = Query("day", description="Group counts by day, week (keyed by Monday) or month (keyed by the 1st)"),
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
-    try:
-        user_id = token.get("user_id")
-        role_str = token.get("role")
-
-        if not user_id or not role_str:
-            raise HTTPException(status_code=401, detail="Unauthorized")
+    """
+    Transcriptions per bucket, by the day their recording was created, read from
+    recording_daily_rollup. The range is matched on whole days.
+    """
+    if bucket not in CHART_BUCKETS:
+        raise HTTPException(status_code=400, detail="Invalid bucket. Use 'day', 'week' or 'month'")
 
-        try:
-            user_role = RoleEnum(role_str)
-        except ValueError:
-            raise HTTPException(status_code=403, detail="Invalid user role")
+    try:
+        user_id = principal.user_id
+        user_role = principal.role
 
         current_user = db.query(User).filter(User.user_id == user_id).first()
         if not current_user:
@@ -387,16 +394,8 @@ def get_transcriptions_chart(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
-        # Determine downline users based on filters
-        users = []
-
-        if city_id:
-            l1_users = db.query(L1).filter(L1.L1_id == city_id).all()
-            users = [u for l1 in l1_users for u in extract_users(l1.user_id, RoleEnum.L1, db)]
-        elif state_id:
-            l3_users = db.query(L3).filter(L3.L3_id == state_id).all()
-            users = [u for l3 in l3_users for u in extract_users(l3.user_id, RoleEnum.L3, db)]
-        elif region_id:
+        # Regional filter permissions (city and state filters take precedence)
+        if region_id and not (city_id or state_id):
             if user_role in [RoleEnum.L0, RoleEnum.L1]:
                 raise HTTPException(status_code=403, detail="L0 and L1 users cannot filter by regional ID.")
             l2_region = db.query(L2).filter(L2.L2_id == region_id).first()
@@ -404,47 +403,34 @@ def get_transcriptions_chart(
                 raise HTTPException(status_code=404, detail="Invalid regional ID provided.")
             if user_role == RoleEnum.L2 and l2_region.user_id != user_id:
                 raise HTTPException(status_code=403, detail="L2 users can only access their own region.")
-            regional_user_id = l2_region.user_id
-            users = extract_users(regional_user_id, RoleEnum.L2, db)
-        else:
-            users = extract_users(user_id, user_role, db)
 
-        user_ids = [u.user_id for u in users]
+        # Determine downline users based on filters
+        user_ids = resolve_scope_user_ids(
+            db, user_id, user_role, city_id=city_id, state_id=state_id, regional_id=region_id
+        )
         user_ids.append(user_id)
 
-        # Query voice recordings for those user IDs
-        base_query = db.query(VoiceRecording).filter(
-            VoiceRecording.user_id.in_(user_ids),
-            VoiceRecording.created_at >= start_date_obj,
-            VoiceRecording.created_at <= end_date_obj
+        filters = rollup_filters(user_ids, start_date_obj.date(), end_date_obj.date())
+        if store_id:
+            filters.append(RecordingDailyRollup.store_id == store_id)
+
+        rows = rollup_transcription_counts(
+            db, filters, bucket_expression(RecordingDailyRollup.day, bucket)
         )
 
-        if store_id:
-            base_query = base_query.filter(VoiceRecording.store_id == store_id)
-
-        recordings = base_query.all()
-        recording_ids = [rec.id for rec in recordings]
-
-        transcriptions = db.query(Transcription).filter(
-            Transcription.audio_id.in_(recording_ids)
-        ).all()
-
-        # Prepare daily counts dictionary
-        daily_counts = {}
-        current_date = start_date_obj.date()
-        end_date = end_date_obj.date()
-        while current_date <= end_date:
-            daily_counts[current_date.isoformat()] = 0
-            current_date += timedelta(days=1)
-
-        for trans in transcriptions:
-            recording = next((rec for rec in recordings if rec.id == trans.audio_id), None)
-            if recording:
-                date_str = recording.created_at.date().isoformat()
-                if date_str in daily_counts:
-                    daily_counts[date_str] += 1
+        # Zero-filled series from the first to the last bucket of the range
+        daily_counts = {
+            day.isoformat(): 0
+            for day in bucket_series(start_date_obj.date(), end_date_obj.date(), bucket)
+        }
+        for row in rows:
+            key = str(row.bucket)[:10]
+            if key in daily_counts:
+                daily_counts[key] += row.count
 
         return daily_counts
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching transcriptions chart: {str(e)}")
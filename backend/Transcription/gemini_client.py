@@ -0,0 +1,121 @@
+"""
+Shared Gemini client: bounded concurrency, a token-bucket rate limit and
+exponential backoff with jitter on retryable provider errors.
+
+The provider does the actual calls, so the client can run against a local fake
+(any object with upload_file and generate_content) instead of the Gemini API.
+"""
+import json
+import logging
+import random
+import threading
+import time
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from backend import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class GenaiProvider:
+    """google.generativeai behind the provider interface; one model shared by all calls."""
+
+    def __init__(self, api_key, model_name):
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name=model_name)
+
+    def upload_file(self, file_path, display_name):
+        return genai.upload_file(path=file_path, display_name=display_name)
+
+    def generate_content(self, prompt, uploaded_file, timeout):
+        response = self.model.generate_content(
+            contents=[prompt, uploaded_file],
+            request_options={"timeout": timeout},
+            generation_config={"response_mime_type": "application/json"},
+        )
+        return response.text
+
+
+class GeminiClient:
+    def __init__(
+        self,
+        provider,
+        max_concurrency=4,
+        requests_per_minute=60,
+        max_attempts=5,
+        backoff_base=2.0,
+        backoff_max=60.0,
+    ):
+        self.provider = provider
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._bucket = TokenBucket(requests_per_minute / 60.0, max(1, max_concurrency))
+
+    def _call(self, operation, fn, *args):
+        for attempt in range(1, self.max_attempts + 1):
+            self._bucket.acquire()
+            started = time.perf_counter()
+            try:
+                with self._semaphore:
+                    result = fn(*args)
+            except RETRYABLE_ERRORS as e:
+                metrics.observe(f"gemini.{operation}", time.perf_counter() - started)
+                if attempt == self.max_attempts:
+                    metrics.incr(f"gemini.{operation}.failure")
+                    raise
+                metrics.incr(f"gemini.{operation}.retry")
+                # full jitter: sleep somewhere in [0, base * 2^attempt], capped
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                logger.warning(
+                    "Gemini %s attempt %s failed (%s); retrying in %.1fs", operation, attempt, e, delay
+                )
+                time.sleep(delay)
+            except Exception:
+                metrics.observe(f"gemini.{operation}", time.perf_counter() - started)
+                metrics.incr(f"gemini.{operation}.failure")
+                raise
+            else:
+                metrics.observe(f"gemini.{operation}", time.perf_counter() - started)
+                metrics.incr(f"gemini.{operation}.success")
+                return result
+
+    def transcribe(self, file_path, display_name, prompt, timeout):
+        """Upload the audio file and return the parsed JSON response."""
+        uploaded_file = self._call("upload", self.provider.upload_file, file_path, display_name)
+        text = self._call("generate", self.provider.generate_content, prompt, uploaded_file, timeout)
+        return json.loads(text)
@@ -1,17 +1,31 @@
 from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording
+from backend.AudioProcessing.rollup import record_transcription
 from backend.Transcription.TranscriptionModel import Transcription, TranscribeAI
+from backend.Transcription.terms import record_terms
 from backend.schemas.TranscriptionSchema import TransctriptionStatus 
 import os
-import google.generativeai as genai
 from dotenv import load_dotenv
 import uuid,requests,json
+from backend.config import TenantSettings
+from backend.Transcription.gemini_client import GeminiClient, GenaiProvider
 
 load_dotenv()
+settings = TenantSettings()
 GeminiKey= os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GeminiKey)
 REQUEST_TIMEOUT = 1800.0
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = 300
 MODEL_NAME = "gemini-2.0-flash"
 
+gemini_client = GeminiClient(
+    GenaiProvider(GeminiKey, MODEL_NAME),
+    max_concurrency=settings.GEMINI_MAX_CONCURRENCY,
+    requests_per_minute=settings.GEMINI_REQUESTS_PER_MINUTE,
+    max_attempts=settings.GEMINI_MAX_ATTEMPTS,
+    backoff_base=settings.GEMINI_BACKOFF_BASE,
+    backoff_max=settings.GEMINI_BACKOFF_MAX,
+)
+
 PROMPT = """
 Process the provided call audio as follows:
  
@@ -60,70 +74,41 @@ Output the results in this exact JSON format:
 """
 
 
-def upload_audio_file(file_path: str, display_name: str):
-    """Uploads an audio file to Google Generative AI."""
-    try:
-        return genai.upload_file(
-            path=file_path,
-            display_name=display_name,
-        )
-    except Exception as e:
-        print("Error in Uploading",e)
-        print(e)
-        return False
-    
-def generate_audio_translation(model, prompt: str, uploaded_file, timeout: float):
-    """Generates translation and transcription from the uploaded audio file."""
-    print("Sending prompt to the model...")
-    try:
-        response = model.generate_content(
-            contents=[prompt, uploaded_file],
-            request_options={"timeout": timeout},
-            generation_config={'response_mime_type': 'application/json'}
-        )
-        # print("Transcription:",response.text)
-        return response
-    except Exception as e:
-        print("Error in Transcription",e)
-        print(e)
-        return False
 def get_ai_transcription(file_path,recording_id):
-    try:
-        uploaded_file = upload_audio_file(file_path, recording_id)
-        model = genai.GenerativeModel(model_name=MODEL_NAME)
-        if(uploaded_file==False):
-            return False
-        # Generate response
-        response = generate_audio_translation(model, PROMPT, uploaded_file, REQUEST_TIMEOUT)
-        if(response==False):
-            return False
-        
-        return json.loads(response.text)
-    except Exception as e:
-        print("Error in AI",e)
-        print(e)
-        return False
+    return gemini_client.transcribe(file_path, recording_id, PROMPT, REQUEST_TIMEOUT)
+
+def download_recording(file_url):
+    """Stream a recording from the CDN into a temporary file and return its path."""
+    download_dir = settings.BASE_UPLOAD_FOLDER + "/upload_files"
+    os.makedirs(download_dir, exist_ok=True)
+    unique_filename = f"{download_dir}/{uuid.uuid4()}.mp3"
+    with requests.get(file_url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        response.raise_for_status()
+        with open(unique_filename, "wb") as file:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                file.write(chunk)
+    return unique_filename
+
 
-def transcribe_audio( recording_id, db):
+def transcribe_audio( recording_id, db, source_path=None):
+    """
+    Transcribe a recording. source_path is the local copy kept from the upload; the
+    file is downloaded from the CDN only when that copy is missing. On failure the
+    recording is marked failed and the error is raised to the caller.
+    """
     recording = (
         db.query(VoiceRecording).filter(VoiceRecording.id == recording_id).first()
     )
     # print(recording.file_url)
     if not recording:
         return False
+    downloaded_file = None
     try:
-        unique_filename = f"./upload_files/{uuid.uuid4()}.mp3"
-        response = requests.get(recording.file_url, stream=True)
-        if response.status_code == 200:
-            with open(unique_filename, "wb") as file:
-                for chunk in response.iter_content(chunk_size=1024):
-                    file.write(chunk)
-        response=get_ai_transcription(unique_filename,recording_id)
-        
-        if(response==False):
-            recording.transcription_status = TransctriptionStatus.failure
-            db.commit()
-            return False
+        if source_path and os.path.exists(source_path):
+            audio_file = source_path
+        else:
+            downloaded_file = audio_file = download_recording(recording.file_url)
+        response=get_ai_transcription(audio_file,recording_id)
         transcription_text = json.dumps(response["Translation"])
         analysis = response.get("analysis", {})
         customer_details = analysis.get("customer_details", {})
@@ -153,19 +138,25 @@ def transcribe_audio( recording_id, db):
             customer_interest=analysis_summary["customer_interest"],
         )
         db.add(transcribe_ai)
+        db.flush()
+        record_terms(db, transcribe_ai)
         db.commit()
         transcription = Transcription(
             audio_id=recording_id, transcription_text=transcription_text
         )
         db.add(transcription)
+        record_transcription(db, recording)
         recording.transcription_status = TransctriptionStatus.completed
         db.commit()
         print("Process Completed")
         return True
     except Exception as e:
         print("Error in Storing",e)
+        db.rollback()
         recording.transcription_status = TransctriptionStatus.failure
         db.commit()
+        raise
     finally:
         db.close()
-        os.remove(unique_filename)
+        if downloaded_file and os.path.exists(downloaded_file):
+            os.remove(downloaded_file)
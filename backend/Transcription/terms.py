@@ -0,0 +1,123 @@
+"""
+transcribe_ai_term: the JSON term lists of transcribe_ai flattened into rows.
+
+transcribe_audio writes the rows together with the TranscribeAI record, so
+per-facet counts come from indexed GROUP BY queries instead of decoding every
+JSON column in Python. To rebuild the table from transcribe_ai:
+
+    python -m backend.Transcription.terms
+"""
+from collections import Counter
+from sqlalchemy import func, desc
+from backend.Transcription.TranscriptionModel import TranscribeAI, TranscribeAITerm
+
+# facet -> TranscribeAI JSON column
+FACET_COLUMNS = {
+    "emotion": "emotional_state",
+    "product": "product_mentions",
+    "complaint": "complaints",
+    "reason": "contact_reason",
+    "interest": "customer_interest",
+    "positive": "positive_keywords",
+    "negative": "negative_keywords",
+}
+TERM_MAX_LENGTH = 255
+
+
+def term_rows(transcribe_ai, created_at=None):
+    """One mapping per term occurrence; duplicates are kept so counts match the lists."""
+    rows = []
+    for facet, column in FACET_COLUMNS.items():
+        for term in getattr(transcribe_ai, column) or []:
+            if term is None or term == "":
+                continue
+            row = {
+                "transcribe_ai_id": transcribe_ai.id,
+                "audio_id": transcribe_ai.audio_id,
+                "facet": facet,
+                "term": str(term)[:TERM_MAX_LENGTH],
+            }
+            if created_at is not None:
+                row["created_at"] = created_at
+            rows.append(row)
+    return rows
+
+
+def record_terms(db, transcribe_ai):
+    """Insert the terms of a flushed TranscribeAI row in the current transaction."""
+    rows = term_rows(transcribe_ai)
+    if rows:
+        db.execute(TranscribeAITerm.__table__.insert(), rows)
+    return len(rows)
+
+
+def term_counts(db, facet, audio_ids, limit=None):
+    """Counter of term -> occurrences for the facet over audio_ids, most common first."""
+    count = func.count().label("count")
+    query = (
+        db.query(TranscribeAITerm.term, count)
+        .filter(TranscribeAITerm.facet == facet, TranscribeAITerm.audio_id.in_(audio_ids))
+        .group_by(TranscribeAITerm.term)
+        .order_by(desc(count), TranscribeAITerm.term)
+    )
+    if limit:
+        query = query.limit(limit)
+    return Counter({row.term: row.count for row in query.all()})
+
+
+def value_counts(db, column, audio_ids, limit=None, exclude=("unknown",)):
+    """
+    Counter over a scalar TranscribeAI column such as gender. Pass
+    TranscribeAI._language for language; TranscribeAI.language is a property.
+    """
+    count = func.count().label("count")
+    query = (
+        db.query(column.label("value"), count)
+        .filter(
+            TranscribeAI.audio_id.in_(audio_ids),
+            column.isnot(None),
+            column.notin_(exclude),
+        )
+        .group_by(column)
+        .order_by(desc(count), column)
+    )
+    if limit:
+        query = query.limit(limit)
+    return Counter({row.value: row.count for row in query.all()})
+
+
+def backfill_terms(db, batch_size=1000):
+    """Rebuild transcribe_ai_term from every transcribe_ai row, batch by batch."""
+    db.query(TranscribeAITerm).delete(synchronize_session=False)
+    total = 0
+    last_id = ""
+    while True:
+        batch = (
+            db.query(TranscribeAI)
+            .filter(TranscribeAI.id > last_id)
+            .order_by(TranscribeAI.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        rows = []
+        for transcribe_ai in batch:
+            rows.extend(term_rows(transcribe_ai, created_at=transcribe_ai.created_at))
+        if rows:
+            db.execute(TranscribeAITerm.__table__.insert(), rows)
+            total += len(rows)
+        last_id = batch[-1].id
+        db.expunge_all()
+    db.commit()
+    return total
+
+
+if __name__ == "__main__":
+    from backend.db.db import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Wrote {backfill_terms(session)} transcribe_ai_term rows")
+    finally:
+        session.close()
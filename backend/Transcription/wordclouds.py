@@ -0,0 +1,134 @@
+"""
+Content-addressed word clouds.
+
+A word cloud is identified by the sha256 of its keyword-frequency histogram and
+stored once at wordcloud/<hash>.png. Identical histograms, from any request or
+process, resolve to the same object; the hash -> url mapping is cached in memory
+and otherwise confirmed with a HEAD before anything is rendered. An empty
+histogram is published the same way, as the "No data available" placeholder.
+
+Rendering happens in the render process pool. Publishing (HEAD, render, upload)
+runs on a small thread pool so a caller can either wait for the url or return
+the hash at once and let clients poll /word-cloud/{hash}. Concurrent requests
+for the same hash share one in-flight publish.
+"""
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from backend import metrics
+from backend.cache import Cache, MemoryBackend
+from backend.config import TenantSettings
+from backend.rendering import RenderService, render_word_cloud
+from backend.storage import storage
+
+logger = logging.getLogger(__name__)
+settings = TenantSettings()
+
+# bump when render_word_cloud changes so old images are not reused
+RENDER_VERSION = 1
+
+word_cloud_cache = Cache(
+    "word_cloud", MemoryBackend(settings.WORD_CLOUD_CACHE_SIZE, settings.WORD_CLOUD_CACHE_TTL)
+)
+render_service = RenderService(
+    settings.RENDER_WORKERS, settings.RENDER_MAX_PENDING, settings.RENDER_TIMEOUT
+)
+publisher = ThreadPoolExecutor(max_workers=max(settings.RENDER_WORKERS, 1), thread_name_prefix="word-cloud")
+
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def frequency_key(frequencies):
+    canonical = json.dumps(
+        {"v": RENDER_VERSION, "terms": sorted(frequencies.items())},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def object_key(digest):
+    return f"wordcloud/{digest}.png"
+
+
+def _publish(digest, frequencies):
+    key = object_key(digest)
+    if storage.head(key):
+        url = storage.url(key)
+    else:
+        png = render_service.render(render_word_cloud, frequencies)
+        url = storage.upload_bytes(png, key, "image/png")
+        metrics.incr("word_cloud.rendered")
+    word_cloud_cache.set(digest, url)
+    return url
+
+
+def _forget(digest, future):
+    with _in_flight_lock:
+        if _in_flight.get(digest) is future:
+            del _in_flight[digest]
+
+
+def start_word_cloud(frequencies):
+    """
+    Make sure the word cloud for a term -> count histogram is published. Returns
+    (hash, url); url is None while it is still being rendered.
+    """
+    frequencies = dict(frequencies)
+    digest = frequency_key(frequencies)
+    url = word_cloud_cache.get(digest)
+    if url:
+        return digest, url
+
+    with _in_flight_lock:
+        if digest in _in_flight:
+            return digest, None
+        future = publisher.submit(_publish, digest, frequencies)
+        _in_flight[digest] = future
+    # outside the lock: a future that is already done runs the callback inline
+    future.add_done_callback(lambda done: _forget(digest, done))
+    return digest, None
+
+
+def wait_for_word_cloud(digest, timeout):
+    with _in_flight_lock:
+        future = _in_flight.get(digest)
+    if future is None:
+        return word_cloud_cache.get(digest)
+    return future.result(timeout=timeout)
+
+
+def word_cloud_url(frequencies):
+    """URL of the word cloud for a histogram, or None if it could not be rendered in time."""
+    digest, url = start_word_cloud(frequencies)
+    if url:
+        return url
+    try:
+        return wait_for_word_cloud(digest, settings.RENDER_TIMEOUT)
+    except Exception as e:
+        logger.warning("Word cloud %s not available: %s", digest, e)
+        return None
+
+
+def word_cloud_status(digest):
+    url = word_cloud_cache.get(digest)
+    if url:
+        return {"status": "ready", "url": url}
+    with _in_flight_lock:
+        if digest in _in_flight:
+            return {"status": "pending", "url": None}
+    # published by another process?
+    key = object_key(digest)
+    if storage.head(key):
+        url = storage.url(key)
+        word_cloud_cache.set(digest, url)
+        return {"status": "ready", "url": url}
+    return {"status": "missing", "url": None}
+
+
+def shutdown():
+    publisher.shutdown(wait=False, cancel_futures=True)
+    render_service.shutdown()
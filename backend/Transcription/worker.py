@@ -0,0 +1,198 @@
+"""
+Transcription job queue.
+
+Jobs live in the transcription_job table and move pending -> in_progress ->
+completed/failure. A pool of worker threads claims pending jobs with
+SELECT ... FOR UPDATE SKIP LOCKED, so several processes can drain the same queue.
+The API process starts TRANSCRIPTION_WORKERS threads on startup; set it to 0 and
+run the pool on its own with:
+
+    python -m backend.Transcription.worker
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from backend import metrics
+from backend.config import TenantSettings
+from backend.db.db import SessionLocal
+from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording
+from backend.AudioProcessing.spool import release_spool, sweep_spool
+from backend.Transcription.TranscriptionModel import TranscriptionJob
+from backend.Transcription.service import transcribe_audio
+from backend.schemas.TranscriptionSchema import TransctriptionStatus
+
+logger = logging.getLogger(__name__)
+settings = TenantSettings()
+
+ACTIVE_STATUSES = (TransctriptionStatus.pending, TransctriptionStatus.in_progress)
+
+
+def enqueue_transcription(db, recording_id, source_path=None):
+    """
+    Queue recording_id for transcription, reusing a job that is already queued or
+    running. source_path is the local upload file, used instead of a CDN download
+    when the worker runs on the same host.
+    """
+    job = (
+        db.query(TranscriptionJob)
+        .filter(
+            TranscriptionJob.recording_id == recording_id,
+            TranscriptionJob.status.in_(ACTIVE_STATUSES),
+        )
+        .first()
+    )
+    if job:
+        return job
+
+    job = TranscriptionJob(
+        recording_id=recording_id,
+        source_path=source_path,
+        status=TransctriptionStatus.pending,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    metrics.incr("transcription.jobs.enqueued")
+    return job
+
+
+def claim_next_job(db):
+    job = (
+        db.query(TranscriptionJob)
+        .filter(TranscriptionJob.status == TransctriptionStatus.pending)
+        .order_by(TranscriptionJob.created_at)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not job:
+        db.rollback()
+        return None
+
+    job.status = TransctriptionStatus.in_progress
+    job.attempts += 1
+    job.started_at = datetime.utcnow()
+
+    recording = db.query(VoiceRecording).filter(VoiceRecording.id == job.recording_id).first()
+    if recording:
+        recording.transcription_status = TransctriptionStatus.in_progress
+
+    db.commit()
+    return job.id, job.recording_id, job.source_path
+
+
+def finish_job(db, job_id, succeeded, error=None):
+    job = db.query(TranscriptionJob).filter(TranscriptionJob.id == job_id).first()
+    job.status = TransctriptionStatus.completed if succeeded else TransctriptionStatus.failure
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    db.commit()
+    metrics.incr(f"transcription.jobs.{'completed' if succeeded else 'failed'}")
+
+
+def requeue_stale_jobs(db, timeout_seconds):
+    """Hand jobs left in_progress by a dead worker back to the queue."""
+    cutoff = datetime.utcnow() - timedelta(seconds=timeout_seconds)
+    count = (
+        db.query(TranscriptionJob)
+        .filter(
+            TranscriptionJob.status == TransctriptionStatus.in_progress,
+            TranscriptionJob.started_at < cutoff,
+        )
+        .update({TranscriptionJob.status: TransctriptionStatus.pending}, synchronize_session=False)
+    )
+    db.commit()
+    return count
+
+
+def run_next_job():
+    """Claim and run one job. Returns False when the queue was empty."""
+    db = SessionLocal()
+    try:
+        claimed = claim_next_job(db)
+    finally:
+        db.close()
+    if not claimed:
+        return False
+
+    job_id, recording_id, source_path = claimed
+    error = None
+    db = SessionLocal()
+    try:
+        with metrics.timed("transcription.job"):
+            succeeded = bool(transcribe_audio(recording_id, db, source_path=source_path))
+        if not succeeded:
+            error = "Recording not found"
+    except Exception as e:
+        logger.exception("Transcription job %s failed", job_id)
+        succeeded, error = False, str(e)
+    finally:
+        db.close()
+
+    db = SessionLocal()
+    try:
+        finish_job(db, job_id, succeeded, error)
+    finally:
+        db.close()
+    # a retry downloads from the CDN, so the spooled copy is no longer needed
+    release_spool(source_path)
+    return True
+
+
+class TranscriptionWorkerPool:
+    def __init__(self, size, poll_interval):
+        self.size = size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        removed = sweep_spool()
+        if removed:
+            logger.info("Removed %s expired upload spool files", removed)
+
+        db = SessionLocal()
+        try:
+            requeued = requeue_stale_jobs(db, settings.TRANSCRIPTION_JOB_TIMEOUT)
+            if requeued:
+                logger.info("Requeued %s stale transcription jobs", requeued)
+        finally:
+            db.close()
+
+        for index in range(self.size):
+            thread = threading.Thread(
+                target=self._run, name=f"transcription-worker-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if run_next_job():
+                    continue
+            except Exception:
+                logger.exception("Transcription worker error")
+            self._stop.wait(self.poll_interval)
+
+
+worker_pool = TranscriptionWorkerPool(
+    settings.TRANSCRIPTION_WORKERS, settings.TRANSCRIPTION_POLL_INTERVAL
+)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    pool = TranscriptionWorkerPool(
+        max(settings.TRANSCRIPTION_WORKERS, 1), settings.TRANSCRIPTION_POLL_INTERVAL
+    )
+    pool.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pool.stop()
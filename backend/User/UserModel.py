@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Text, DateTime, Float, ForeignKey, func, Enum
+from sqlalchemy import Column, String, Text, DateTime, Float, ForeignKey, func, Enum, Integer, Index
 from sqlalchemy.orm import declarative_base, relationship
 from backend.schemas.StatusSchema import StatusEnum
 from backend.schemas.RoleSchema import RoleEnum
@@ -32,6 +32,12 @@ class User(Base):
     )
     status = Column(Enum(StatusEnum), nullable=False, default=StatusEnum.ACTIVE)
 
+    __table_args__ = (
+        Index("ix_user_email_id", "email_id"),
+        Index("ix_user_reports_to", "reports_to"),
+        Index("ix_user_business_id", "business_id"),
+    )
+
 
 class Staff(Base):
     __tablename__ = "staff"
@@ -47,3 +53,17 @@ class Staff(Base):
         nullable=False,
     )
     staff_status = Column(Enum(StatusEnum), nullable=False, default=StatusEnum.ACTIVE)
+
+
+# materialized ancestor/descendant pairs of the reports_to tree (closure table)
+class UserHierarchy(Base):
+    __tablename__ = "user_hierarchy"
+    ancestor_id = Column(String(36), primary_key=True)
+    descendant_id = Column(String(36), primary_key=True)
+    depth = Column(Integer, nullable=False)  # 0 for the self row
+    business_id = Column(String(36), nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_hierarchy_ancestor_depth", "ancestor_id", "depth"),
+        Index("ix_user_hierarchy_business_id", "business_id"),
+    )
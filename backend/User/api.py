@@ -14,39 +14,31 @@ from backend.Store.StoreModel import L0
 from backend.Area.AreaModel import L1
 from backend.schemas.RoleSchema import RoleEnum
 from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording
-from sqlalchemy import func
-from backend.db.db import get_session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.db.db import get_async_session, get_session
 from sqlalchemy.exc import SQLAlchemyError
 from backend.User.UserSchema import UserUpdateSchema, UserUpdateResponse
 import uuid
-from backend.User.service import extract_users
-from backend.auth.jwt_handler import verify_token
+from backend.User.service import extract_users, lock_business_hierarchy, rebuild_user_hierarchy
+from backend.auth.principal import Principal, get_principal
 from backend.auth.role_checker import check_role
 
-# from backend.utils.password import hash_password
-from passlib.context import CryptContext
+from backend.auth.login_limiter import forget_unknown_email
+from backend.auth.passwords import hash_password
 
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
 
 @router.post("/create-user", response_model=CreateUserResponse)
-def create_user(user: UserCreate, db: Session = Depends(get_session)):
-    existing_user = db.query(User).filter(User.email_id == user.email_id).first()
-    if existing_user:
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_session)):
+    result = await db.execute(select(User.user_id).where(User.email_id == user.email_id))
+    if result.first():
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = hash_password(user.password)
+    hashed_password = await hash_password(user.password)
+    await db.run_sync(lock_business_hierarchy, user.business_id)
     db_user = User(
         user_id=str(uuid.uuid4()),
         name=user.name,
@@ -60,8 +52,11 @@ def create_user(user: UserCreate, db: Session = Depends(get_session)):
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.flush()
+    await db.run_sync(rebuild_user_hierarchy, db_user.business_id)
+    await db.commit()
+    await db.refresh(db_user)
+    forget_unknown_email(db_user.email_id)
 
     return db_user
 
@@ -70,12 +65,10 @@ def create_user(user: UserCreate, db: Session = Depends(get_session)):
 @check_role([RoleEnum.L1, RoleEnum.L2, RoleEnum.L3, RoleEnum.L4])
 def read_users(
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
-    user_id = token.get("user_id")
-    user_role = token.get("role")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Unauthorized")
+    user_id = principal.user_id
+    user_role = principal.role
 
     user_data = extract_users(user_id, user_role, db)
     if not user_data:
@@ -89,17 +82,10 @@ def edit_user(
     user_id: str,
     user_update: UserUpdateSchema,  # Use a dedicated update schema
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
     try:
-        token_user_id = token.get("user_id")
-        if not token_user_id:
-            raise HTTPException(status_code=401, detail="Authentication required")
-
-        try:
-            user_role = RoleEnum(token.get("role", ""))
-        except ValueError:
-            raise HTTPException(status_code=403, detail="Invalid user role")
+        user_role = principal.role
 
         if user_role != RoleEnum.L4:
             raise HTTPException(
@@ -123,10 +109,17 @@ def edit_user(
                 )
 
         update_data = user_update.dict(exclude_unset=True)
+        if "reports_to" in update_data or "email_id" in update_data:
+            lock_business_hierarchy(db, user.business_id)
         for field, value in update_data.items():
             setattr(user, field, value)
+        if "reports_to" in update_data or "email_id" in update_data:
+            db.flush()
+            rebuild_user_hierarchy(db, user.business_id)
         db.commit()
         db.refresh(user)
+        if "email_id" in update_data:
+            forget_unknown_email(user.email_id)
 
         return {
             "message": "User updated successfully",
@@ -151,18 +144,10 @@ def edit_user(
 def delete_user(
     user_id: str,
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
     try:
-        token_user_id = token.get("user_id")
-        role_str = token.get("role")
-        if not token_user_id:
-            raise HTTPException(status_code=401, detail="Unauthorized")
-
-        try:
-            user_role = RoleEnum(role_str)
-        except ValueError:
-            raise HTTPException(status_code=403, detail="Invalid user role.")
+        user_role = principal.role
 
         if user_role != RoleEnum.L4:
             raise HTTPException(status_code=403, detail="Only admins can delete users.")
@@ -171,7 +156,10 @@ def delete_user(
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
+        lock_business_hierarchy(db, user.business_id)
         db.delete(user)
+        db.flush()
+        rebuild_user_hierarchy(db, user.business_id)
         db.commit()
         return {"message": "User deleted successfully", "user_id": user_id}
 
@@ -186,11 +174,9 @@ def delete_user(
 def add_staff(
     staff_body: StaffCreate,
     db: Session = Depends(get_session),
-    token: dict = Depends(verify_token),
+    principal: Principal = Depends(get_principal),
 ):
-    user_id = token.get("user_id")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid token or user ID missing")
+    user_id = principal.user_id
     existing_staff = (
         db.query(Staff)
         .filter(Staff.email_id == staff_body.email_id, Staff.user_id == user_id)
@@ -237,10 +223,10 @@ def add_staff(
 # @router.get("/get-all-staff", response_model=list[StaffResponses])
 # async def get_all_staff(
 #     db: Session = Depends(get_session),
-#     token: dict = Depends(verify_token),
+#     principal: Principal = Depends(get_principal),
 # ):
 #     try:
-#         user = db.query(User).filter(User.user_id == token.get("user_id")).first()
+#         user = db.query(User).filter(User.user_id == principal.user_id).first()
 #         if not user:
 #             raise HTTPException(status_code=401, detail="Invalid user")
 #         staff_members = (
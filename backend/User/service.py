@@ -1,12 +1,68 @@
+from collections import defaultdict
 from fastapi import HTTPException
-from backend.User.UserModel import User
+from sqlalchemy import event, inspect, tuple_
+from sqlalchemy.orm import Session
+from backend.Business.BusinessModel import Business
+from backend.User.UserModel import User, UserHierarchy
 from backend.Store.StoreModel import L0
 from backend.Area.AreaModel import L1
+from backend.sales.SalesModel import L2
+from backend.State.stateModel import L3
+from backend.cache import Cache, MemoryBackend
+from backend.config import TenantSettings
 from backend.AudioProcessing.VoiceRecordingModel import VoiceRecording
 from backend.schemas.RoleSchema import RoleEnum
 from sqlalchemy import func
 from backend.User.UserSchema import UserResponse
 
+settings = TenantSettings()
+
+# resolved downline scopes, keyed by (token user, role, city/state/regional filter)
+scope_cache = Cache(
+    "user_scope",
+    MemoryBackend(maxsize=settings.SCOPE_CACHE_SIZE, ttl=settings.SCOPE_CACHE_TTL),
+)
+# columns whose changes can move users in or out of a scope; inserts and
+# deletes of these models always count
+SCOPE_COLUMNS = {
+    User: ("reports_to", "email_id", "business_id", "role"),
+    UserHierarchy: ("ancestor_id", "descendant_id", "depth"),
+    L0: ("user_id",),
+    L1: ("user_id",),
+    L2: ("user_id",),
+    L3: ("user_id",),
+}
+SCOPE_MODELS = tuple(SCOPE_COLUMNS)
+
+
+def _changes_scope(obj):
+    state = inspect(obj)
+    return any(state.attrs[column].history.has_changes() for column in SCOPE_COLUMNS[type(obj)])
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_scope_writes(session, flush_context):
+    # last_login and password updates on every login must not clear the cache
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, SCOPE_MODELS):
+            session.info["scope_changed"] = True
+            return
+    for obj in session.dirty:
+        if isinstance(obj, SCOPE_MODELS) and _changes_scope(obj):
+            session.info["scope_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_scope_cache(session):
+    if session.info.pop("scope_changed", False):
+        scope_cache.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_scope_writes(session):
+    session.info.pop("scope_changed", None)
+
 
 def get_users(db, email_id):
     users = db.query(User).filter(User.reports_to == email_id).all()
@@ -28,55 +84,140 @@ def get_l4_users(db, business_id):
     return users
 
 
+# how many reports_to levels below the caller each role can see
+ROLE_DEPTH = {RoleEnum.L1: 1, RoleEnum.L2: 2, RoleEnum.L3: 3}
+
+
+def lock_business_hierarchy(db, business_id):
+    """
+    Take the per-business lock that serializes user_hierarchy rebuilds. User write
+    routes call it before touching User, so two writers in one business cannot
+    interleave their user and closure changes.
+    """
+    db.query(Business.business_id).filter(Business.business_id == business_id).with_for_update().first()
+
+
+def _closure_rows(users):
+    children = defaultdict(list)
+    for row in users:
+        if row.reports_to:
+            children[row.reports_to].append(row)
+
+    closure = {}
+    for root in users:
+        closure[(root.user_id, root.user_id)] = 0
+        seen = {root.user_id}
+        frontier = [root.email_id]
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for email in frontier:
+                for child in children.get(email, []):
+                    if child.user_id in seen:
+                        continue
+                    seen.add(child.user_id)
+                    closure[(root.user_id, child.user_id)] = depth
+                    next_frontier.append(child.email_id)
+            frontier = next_frontier
+    return closure
+
+
+def rebuild_user_hierarchy(db, business_id):
+    """
+    Bring the user_hierarchy closure rows of one business in line with
+    User.reports_to. Callers hold lock_business_hierarchy and call this before
+    they commit. Users are read with a locking read so the tree is the latest
+    committed one, and only the pairs that changed are written.
+    """
+    users = (
+        db.query(User.user_id, User.email_id, User.reports_to)
+        .filter(User.business_id == business_id)
+        .with_for_update(read=True)
+        .all()
+    )
+    wanted = _closure_rows(users)
+
+    existing = {
+        (row.ancestor_id, row.descendant_id): row.depth
+        for row in db.query(
+            UserHierarchy.ancestor_id, UserHierarchy.descendant_id, UserHierarchy.depth
+        ).filter(UserHierarchy.business_id == business_id)
+    }
+
+    stale = [pair for pair, depth in existing.items() if wanted.get(pair) != depth]
+    for start in range(0, len(stale), 500):
+        db.query(UserHierarchy).filter(
+            tuple_(UserHierarchy.ancestor_id, UserHierarchy.descendant_id).in_(stale[start:start + 500])
+        ).delete(synchronize_session=False)
+
+    added = [
+        {"ancestor_id": ancestor, "descendant_id": descendant, "depth": depth, "business_id": business_id}
+        for (ancestor, descendant), depth in wanted.items()
+        if existing.get((ancestor, descendant)) != depth
+    ]
+    for start in range(0, len(added), 1000):
+        db.execute(UserHierarchy.__table__.insert(), added[start:start + 1000])
+
+
+def backfill_user_hierarchy(db):
+    """Rebuild the closure of every business, one transaction per business."""
+    business_ids = [row.business_id for row in db.query(User.business_id).distinct()]
+    for business_id in business_ids:
+        lock_business_hierarchy(db, business_id)
+        rebuild_user_hierarchy(db, business_id)
+        db.commit()
+    return len(business_ids)
+
+
+def get_downline_user_ids(db, user_id, max_depth=None):
+    """
+    All user_ids below user_id (excluding itself), at most max_depth levels down.
+    A single lookup on the closure table; a user without closure rows has an
+    empty downline.
+    """
+    query = db.query(UserHierarchy.descendant_id).filter(
+        UserHierarchy.ancestor_id == user_id,
+        UserHierarchy.depth > 0,
+    )
+    if max_depth is not None:
+        query = query.filter(UserHierarchy.depth <= max_depth)
+    return [row.descendant_id for row in query.all()]
+
+
 def get_user_ids_by_hierarchy(user_id, user_role, db):
     """
     Optimized function to get only user IDs based on hierarchy without fetching additional data.
     This is much faster than extract_users when only IDs are needed.
     """
-    current_user = db.query(User.business_id, User.email_id).filter(User.user_id == user_id).first()
+    current_user = db.query(User.business_id).filter(User.user_id == user_id).first()
 
     if not current_user:
         raise HTTPException(status_code=404, detail="User not found")
 
     business_id = current_user.business_id
-    email_id = current_user.email_id
-    
+
     # Base case - always include the current user
     result_ids = [user_id]
-    
+
     if user_role == RoleEnum.L4:
         # For L4, get all users in the business
         user_ids = db.query(User.user_id).filter(User.business_id == business_id).all()
         result_ids = [user_id[0] for user_id in user_ids]
     elif user_role in [RoleEnum.L1, RoleEnum.L2, RoleEnum.L3]:
-        # For hierarchy-based roles, recursively get subordinates
-        to_process = [email_id]
-        processed = set()
-        
-        while to_process:
-            current_emails = to_process.copy()
-            to_process.clear()
-            
-            if not current_emails:
-                break
-                
-            # Get all direct reports in one query
-            subordinates = db.query(User.user_id, User.email_id).filter(
-                User.reports_to.in_(current_emails)
-            ).all()
-            
-            for sub in subordinates:
-                if sub.email_id not in processed:
-                    result_ids.append(sub.user_id)
-                    processed.add(sub.email_id)
-                    to_process.append(sub.email_id)
-                    
+        # For hierarchy-based roles, every subordinate at any depth
+        result_ids += get_downline_user_ids(db, user_id)
+
     return result_ids
 
 
-def extract_users(user_id, user_role, db):
+def resolve_user_ids(user_id, user_role, db):
+    """
+    user_ids visible to user_id under user_role, without loading or enriching the
+    users. Same scope as extract_users; use this when only the IDs are needed.
+    """
     current_user = (
-        db.query(User.business_id, User.email_id)
+        db.query(User.business_id)
         .filter(User.user_id == user_id)
         .first()
     )
@@ -85,41 +226,31 @@ def extract_users(user_id, user_role, db):
         raise HTTPException(status_code=404, detail="User not found")
 
     business_id = current_user.business_id
-    email_id = current_user.email_id
 
-    # Fetch all users in one optimized query
-    def fetch_users(email_ids):
-        return db.query(User).filter(User.reports_to.in_(email_ids)).all()
+    if user_role in ROLE_DEPTH:
+        return get_downline_user_ids(db, user_id, max_depth=ROLE_DEPTH[user_role])
 
-    users = []
-    email_ids = [email_id]
+    if user_role == RoleEnum.L4:
+        user_ids = db.query(User.user_id).filter(User.business_id == business_id).all()
+        return [row.user_id for row in user_ids]
 
-    if user_role == RoleEnum.L1:
-        users = fetch_users(email_ids)
+    return []
 
-    elif user_role == RoleEnum.L2:
-        L1_users = fetch_users(email_ids)
-        email_ids = [user.email_id for user in L1_users]
-        L0_users = fetch_users(email_ids)
-        users = L1_users + L0_users
 
-    elif user_role == RoleEnum.L3:
-        L2_users = fetch_users(email_ids)
-        email_ids = [user.email_id for user in L2_users]
-        L1_users = fetch_users(email_ids)
-        email_ids = [user.email_id for user in L1_users]
-        L0_users = fetch_users(email_ids)
-        users = L2_users + L1_users + L0_users
+def extract_users(user_id, user_role, db, with_recordings=True):
+    user_ids = resolve_user_ids(user_id, user_role, db)
+    return enrich_users(user_ids, db, with_recordings=with_recordings)
 
-    elif user_role == RoleEnum.L4:
-        users = get_l4_users(db, business_id)
 
-    if not users:
+def enrich_users(user_ids, db, with_recordings=True):
+    """
+    Build UserResponse objects for user_ids with store, area and manager names.
+    The per-user recording aggregate is only computed when with_recordings is set.
+    """
+    if not user_ids:
         return []
 
-    # Remove duplicates and extract user IDs
-    users = list({user.user_id: user for user in users}.values())
-    user_ids = [user.user_id for user in users]
+    users = db.query(User).filter(User.user_id.in_(user_ids)).all()
     reports_to_ids = list(set(user.reports_to for user in users if user.reports_to))
 
     # Batch fetch all necessary data in one go
@@ -144,18 +275,20 @@ def extract_users(user_id, user_role, db):
         .all()
     }
 
-    recording_map = {
-        rec.user_id: rec
-        for rec in db.query(
-            VoiceRecording.user_id,
-            func.sum(VoiceRecording.call_duration).label("total_duration"),
-            func.sum(VoiceRecording.listening_time).label("total_listening"),
-            func.count(VoiceRecording.id).label("recording_count"),
-        )
-        .filter(VoiceRecording.user_id.in_(user_ids))
-        .group_by(VoiceRecording.user_id)
-        .all()
-    }
+    recording_map = {}
+    if with_recordings:
+        recording_map = {
+            rec.user_id: rec
+            for rec in db.query(
+                VoiceRecording.user_id,
+                func.sum(VoiceRecording.call_duration).label("total_duration"),
+                func.sum(VoiceRecording.listening_time).label("total_listening"),
+                func.count(VoiceRecording.id).label("recording_count"),
+            )
+            .filter(VoiceRecording.user_id.in_(user_ids))
+            .group_by(VoiceRecording.user_id)
+            .all()
+        }
 
     # Construct user response
     user_data = [
@@ -193,3 +326,37 @@ def extract_users(user_id, user_role, db):
     ]
 
     return user_data
+
+
+def resolve_scope_user_ids(db, user_id, user_role, city_id=None, state_id=None, regional_id=None):
+    """
+    user_ids a dashboard request covers. The most specific filter wins (city, then
+    state, then region); without one it is the caller's own downline. Cached per
+    (user, role, filter) until the TTL runs out or the org tables change.
+    Permission checks on the filters stay with the route.
+    """
+    key = f"scope:{user_id}:{int(user_role)}:{city_id or ''}:{state_id or ''}:{regional_id or ''}"
+
+    def load():
+        if city_id:
+            owners, owner_role = db.query(L1.user_id).filter(L1.L1_id == city_id).all(), RoleEnum.L1
+        elif state_id:
+            owners, owner_role = db.query(L3.user_id).filter(L3.L3_id == state_id).all(), RoleEnum.L3
+        elif regional_id:
+            owners, owner_role = db.query(L2.user_id).filter(L2.L2_id == regional_id).all(), RoleEnum.L2
+        else:
+            return resolve_user_ids(user_id, user_role, db)
+        return [uid for owner in owners for uid in resolve_user_ids(owner.user_id, owner_role, db)]
+
+    # callers get their own copy; the cached list is shared
+    return list(scope_cache.get_or_load(key, load))
+
+
+if __name__ == "__main__":
+    from backend.db.db import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Rebuilt user_hierarchy for {backfill_user_hierarchy(session)} businesses")
+    finally:
+        session.close()
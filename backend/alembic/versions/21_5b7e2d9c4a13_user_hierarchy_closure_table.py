@@ -0,0 +1,38 @@
+"""user hierarchy closure table
+
+Revision ID: 5b7e2d9c4a13
+Revises: 94b59465f0b9
+Create Date: 2025-04-21 11:02:17.415093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2d9c4a13'
+down_revision: Union[str, None] = '94b59465f0b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_hierarchy',
+    sa.Column('ancestor_id', sa.String(length=36), nullable=False),
+    sa.Column('descendant_id', sa.String(length=36), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.Column('business_id', sa.String(length=36), nullable=False),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_user_hierarchy_ancestor_depth', 'user_hierarchy', ['ancestor_id', 'depth'], unique=False)
+    op.create_index('ix_user_hierarchy_business_id', 'user_hierarchy', ['business_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_hierarchy_business_id', table_name='user_hierarchy')
+    op.drop_index('ix_user_hierarchy_ancestor_depth', table_name='user_hierarchy')
+    op.drop_table('user_hierarchy')
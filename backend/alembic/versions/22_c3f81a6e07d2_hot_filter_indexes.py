@@ -0,0 +1,44 @@
+"""hot filter indexes
+
+Revision ID: c3f81a6e07d2
+Revises: 5b7e2d9c4a13
+Create Date: 2025-04-23 16:40:52.281664
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f81a6e07d2'
+down_revision: Union[str, None] = '5b7e2d9c4a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # analytics scope: user_id IN (...) AND created_at/start_time BETWEEN ...
+    op.create_index('ix_voice_recording_user_id_created_at', 'voice_recording', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_voice_recording_user_id_start_time', 'voice_recording', ['user_id', 'start_time'], unique=False)
+    op.create_index('ix_feedback_audio_id', 'feedback', ['audio_id'], unique=False)
+    op.create_index('ix_feedback_user_id_created_at', 'feedback', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_transcription_audio_id', 'transcription', ['audio_id'], unique=False)
+    op.create_index('ix_transcribe_ai_audio_id', 'transcribe_ai', ['audio_id'], unique=False)
+    op.create_index('ix_user_email_id', 'user', ['email_id'], unique=False)
+    op.create_index('ix_user_reports_to', 'user', ['reports_to'], unique=False)
+    op.create_index('ix_user_business_id', 'user', ['business_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_business_id', table_name='user')
+    op.drop_index('ix_user_reports_to', table_name='user')
+    op.drop_index('ix_user_email_id', table_name='user')
+    op.drop_index('ix_transcribe_ai_audio_id', table_name='transcribe_ai')
+    op.drop_index('ix_transcription_audio_id', table_name='transcription')
+    op.drop_index('ix_feedback_user_id_created_at', table_name='feedback')
+    op.drop_index('ix_feedback_audio_id', table_name='feedback')
+    op.drop_index('ix_voice_recording_user_id_start_time', table_name='voice_recording')
+    op.drop_index('ix_voice_recording_user_id_created_at', table_name='voice_recording')
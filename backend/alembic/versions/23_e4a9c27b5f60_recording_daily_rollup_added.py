@@ -0,0 +1,92 @@
+"""recording daily rollup added
+
+Revision ID: e4a9c27b5f60
+Revises: c3f81a6e07d2
+Create Date: 2025-04-28 12:15:03.907412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c27b5f60'
+down_revision: Union[str, None] = 'c3f81a6e07d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('recording_daily_rollup',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('store_id', sa.String(length=36), nullable=False),
+    sa.Column('recording_count', sa.Integer(), nullable=False),
+    sa.Column('duration_sum', sa.Float(), nullable=False),
+    sa.Column('listening_sum', sa.Float(), nullable=False),
+    sa.Column('last_listening_time', sa.DateTime(), nullable=True),
+    sa.Column('hourly_counts', sa.JSON(), nullable=False),
+    sa.Column('transcription_count', sa.Integer(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'store_id')
+    )
+    op.create_index('ix_recording_daily_rollup_day', 'recording_daily_rollup', ['day'], unique=False)
+    # same grouping as backend.AudioProcessing.rollup.backfill_rollup
+    op.execute(
+        """
+        INSERT INTO recording_daily_rollup
+            (user_id, day, store_id, recording_count, duration_sum, listening_sum,
+             last_listening_time, hourly_counts, transcription_count, modified_at)
+        SELECT
+            user_id,
+            DATE(created_at),
+            COALESCE(store_id, ''),
+            COUNT(*),
+            COALESCE(SUM(call_duration), 0),
+            COALESCE(SUM(listening_time), 0),
+            MAX(last_listening_time),
+            JSON_ARRAY(
+                COALESCE(SUM(HOUR(start_time) = 0), 0),
+                COALESCE(SUM(HOUR(start_time) = 1), 0),
+                COALESCE(SUM(HOUR(start_time) = 2), 0),
+                COALESCE(SUM(HOUR(start_time) = 3), 0),
+                COALESCE(SUM(HOUR(start_time) = 4), 0),
+                COALESCE(SUM(HOUR(start_time) = 5), 0),
+                COALESCE(SUM(HOUR(start_time) = 6), 0),
+                COALESCE(SUM(HOUR(start_time) = 7), 0),
+                COALESCE(SUM(HOUR(start_time) = 8), 0),
+                COALESCE(SUM(HOUR(start_time) = 9), 0),
+                COALESCE(SUM(HOUR(start_time) = 10), 0),
+                COALESCE(SUM(HOUR(start_time) = 11), 0),
+                COALESCE(SUM(HOUR(start_time) = 12), 0),
+                COALESCE(SUM(HOUR(start_time) = 13), 0),
+                COALESCE(SUM(HOUR(start_time) = 14), 0),
+                COALESCE(SUM(HOUR(start_time) = 15), 0),
+                COALESCE(SUM(HOUR(start_time) = 16), 0),
+                COALESCE(SUM(HOUR(start_time) = 17), 0),
+                COALESCE(SUM(HOUR(start_time) = 18), 0),
+                COALESCE(SUM(HOUR(start_time) = 19), 0),
+                COALESCE(SUM(HOUR(start_time) = 20), 0),
+                COALESCE(SUM(HOUR(start_time) = 21), 0),
+                COALESCE(SUM(HOUR(start_time) = 22), 0),
+                COALESCE(SUM(HOUR(start_time) = 23), 0)
+            ),
+            COALESCE(SUM(transcriptions), 0),
+            CURRENT_TIMESTAMP
+        FROM voice_recording
+        LEFT JOIN (
+            SELECT audio_id, COUNT(*) AS transcriptions FROM transcription GROUP BY audio_id
+        ) transcription_counts ON transcription_counts.audio_id = voice_recording.id
+        WHERE created_at IS NOT NULL
+        GROUP BY user_id, DATE(created_at), COALESCE(store_id, '')
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recording_daily_rollup_day', table_name='recording_daily_rollup')
+    op.drop_table('recording_daily_rollup')
@@ -0,0 +1,43 @@
+"""transcription job table added
+
+Revision ID: 7d2f5e8b1c94
+Revises: e4a9c27b5f60
+Create Date: 2025-05-02 10:48:39.120571
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f5e8b1c94'
+down_revision: Union[str, None] = 'e4a9c27b5f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('transcription_job',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('recording_id', sa.String(length=36), nullable=False),
+    sa.Column('status', sa.Enum('failure', 'pending', 'in_progress', 'completed', name='transctriptionstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('modified_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_transcription_job_status_created_at', 'transcription_job', ['status', 'created_at'], unique=False)
+    op.create_index('ix_transcription_job_recording_id', 'transcription_job', ['recording_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transcription_job_recording_id', table_name='transcription_job')
+    op.drop_index('ix_transcription_job_status_created_at', table_name='transcription_job')
+    op.drop_table('transcription_job')
@@ -0,0 +1,28 @@
+"""transcription job source path
+
+Revision ID: a1c6d3f9e827
+Revises: 7d2f5e8b1c94
+Create Date: 2025-05-06 09:31:12.664208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c6d3f9e827'
+down_revision: Union[str, None] = '7d2f5e8b1c94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('transcription_job', sa.Column('source_path', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('transcription_job', 'source_path')
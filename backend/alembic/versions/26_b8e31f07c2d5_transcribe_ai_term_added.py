@@ -0,0 +1,44 @@
+"""transcribe ai term added
+
+Revision ID: b8e31f07c2d5
+Revises: a1c6d3f9e827
+Create Date: 2025-05-07 15:12:48.305117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e31f07c2d5'
+down_revision: Union[str, None] = 'a1c6d3f9e827'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('transcribe_ai_term',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('transcribe_ai_id', sa.String(length=36), nullable=False),
+    sa.Column('audio_id', sa.String(length=36), nullable=False),
+    sa.Column('facet', sa.String(length=32), nullable=False),
+    sa.Column('term', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_transcribe_ai_term_audio_facet_term', 'transcribe_ai_term', ['audio_id', 'facet', 'term'], unique=False)
+    op.create_index('ix_transcribe_ai_term_facet_created_at', 'transcribe_ai_term', ['facet', 'created_at'], unique=False)
+    op.create_index('ix_transcribe_ai_term_transcribe_ai_id', 'transcribe_ai_term', ['transcribe_ai_id'], unique=False)
+    op.create_index('ix_transcribe_ai_language_gender', 'transcribe_ai', ['audio_id', 'language', 'gender'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transcribe_ai_language_gender', table_name='transcribe_ai')
+    op.drop_index('ix_transcribe_ai_term_transcribe_ai_id', table_name='transcribe_ai_term')
+    op.drop_index('ix_transcribe_ai_term_facet_created_at', table_name='transcribe_ai_term')
+    op.drop_index('ix_transcribe_ai_term_audio_facet_term', table_name='transcribe_ai_term')
+    op.drop_table('transcribe_ai_term')
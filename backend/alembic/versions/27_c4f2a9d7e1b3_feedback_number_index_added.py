@@ -0,0 +1,27 @@
+"""feedback number index added
+
+Revision ID: c4f2a9d7e1b3
+Revises: b8e31f07c2d5
+Create Date: 2025-05-09 11:26:03.418752
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f2a9d7e1b3'
+down_revision: Union[str, None] = 'b8e31f07c2d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_feedback_user_number_created_at', 'feedback', ['user_id', 'number', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_feedback_user_number_created_at', table_name='feedback')
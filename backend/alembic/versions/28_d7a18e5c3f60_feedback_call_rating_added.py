@@ -0,0 +1,44 @@
+"""feedback call rating added
+
+Revision ID: d7a18e5c3f60
+Revises: c4f2a9d7e1b3
+Create Date: 2025-05-09 16:48:21.906337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a18e5c3f60'
+down_revision: Union[str, None] = 'c4f2a9d7e1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('feedback', sa.Column('call_rating', sa.String(length=16), nullable=True))
+    # parse callRating out of the stored JSON once, same rules as parse_call_rating
+    op.execute(
+        """
+        UPDATE feedback
+        SET call_rating = CASE WHEN JSON_VALID(feedback) THEN
+            CASE LOWER(TRIM(JSON_UNQUOTE(JSON_EXTRACT(feedback, '$.callRating'))))
+                WHEN 'good' THEN 'good'
+                WHEN 'average' THEN 'average'
+                WHEN 'bad' THEN 'bad'
+            END
+        END
+        WHERE JSON_VALID(feedback)
+        """
+    )
+    op.create_index('ix_feedback_audio_id_call_rating', 'feedback', ['audio_id', 'call_rating'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_feedback_audio_id_call_rating', table_name='feedback')
+    op.drop_column('feedback', 'call_rating')
@@ -0,0 +1,46 @@
+"""user hierarchy backfilled
+
+Revision ID: e2b6c81f4a97
+Revises: d7a18e5c3f60
+Create Date: 2025-05-12 10:04:36.582194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b6c81f4a97'
+down_revision: Union[str, None] = 'd7a18e5c3f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # lookups no longer build the closure on demand, so fill it for every business;
+    # the depth cap stops reports_to cycles, MIN(depth) matches the breadth-first rebuild
+    op.execute("DELETE FROM user_hierarchy")
+    op.execute(
+        """
+        INSERT INTO user_hierarchy (ancestor_id, descendant_id, depth, business_id)
+        WITH RECURSIVE tree (ancestor_id, descendant_id, email_id, depth, business_id) AS (
+            SELECT user_id, user_id, email_id, 0, business_id FROM `user`
+            UNION ALL
+            SELECT tree.ancestor_id, child.user_id, child.email_id, tree.depth + 1, tree.business_id
+            FROM tree
+            JOIN `user` child
+                ON child.reports_to = tree.email_id AND child.business_id = tree.business_id
+            WHERE tree.depth < 32
+        )
+        SELECT ancestor_id, descendant_id, MIN(depth), MIN(business_id)
+        FROM tree
+        GROUP BY ancestor_id, descendant_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM user_hierarchy")
@@ -1,8 +1,13 @@
+import hashlib
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Optional
+from cachetools import LRUCache
 from jose import JWTError, jwt
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from backend import metrics
 from backend.schemas.RoleSchema import RoleEnum
 
 SECRET_KEY = "your-secret-key-here"  # Move this to .env in production
@@ -11,6 +16,10 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 security = HTTPBearer()
 
+VERIFIED_TOKEN_CACHE_SIZE = 4096
+_verified_tokens = LRUCache(maxsize=VERIFIED_TOKEN_CACHE_SIZE)
+_verified_lock = threading.Lock()
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -23,10 +32,36 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
+def _decode(token):
+    key = hashlib.sha256(token.encode()).hexdigest()
+    now = time.time()
+    with _verified_lock:
+        cached = _verified_tokens.get(key)
+    if cached is not None:
+        payload, expires_at = cached
+        if expires_at is None or expires_at > now:
+            metrics.incr("jwt.cache.hits")
+            # every request gets its own copy; the cached claims are shared
+            return dict(payload)
+        with _verified_lock:
+            _verified_tokens.pop(key, None)
+
+    metrics.incr("jwt.cache.misses")
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    with _verified_lock:
+        _verified_tokens[key] = (dict(payload), payload.get("exp"))
+    return payload
+
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
+    """
+    Verified claims of the bearer token. Tokens already verified are served from
+    an LRU keyed by the token's hash until their exp, so repeated requests with
+    the same token skip the signature check.
+    """
     try:
         token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _decode(token)
         return payload
     except JWTError:
         raise HTTPException(
@@ -0,0 +1,141 @@
+"""
+Login throttling in front of bcrypt.
+
+Two sliding-window limiters are consulted before any password is hashed: one per
+client IP and one per email. Each attempt reserves a slot in both before the
+password is checked, so a concurrent burst cannot all get past the check; a
+successful login clears its email's window and gives its IP slot back, so only
+failed attempts use up an IP's budget. Unknown emails are remembered for a short while so
+retries skip the User query. The window store and the negative cache are both
+pluggable (set_store / set_backend) so several workers can share them.
+
+Counters: login_limiter.<name>.allowed / .blocked and the cache.login_unknown_email.*
+counters of the negative cache.
+"""
+import threading
+import time
+from collections import deque
+from cachetools import LRUCache
+from backend import metrics
+from backend.cache import Cache, MemoryBackend
+from backend.config import TenantSettings
+
+settings = TenantSettings()
+
+
+class MemoryWindowStore:
+    """Per-key event timestamps in process memory; the least recently used keys are dropped first."""
+
+    def __init__(self, maxsize):
+        self._events = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def _trimmed(self, key, now, window):
+        events = self._events.get(key)
+        if events is None:
+            return None
+        while events and events[0] <= now - window:
+            events.popleft()
+        return events
+
+    def count(self, key, now, window):
+        with self._lock:
+            events = self._trimmed(key, now, window)
+            return len(events) if events else 0
+
+    def oldest(self, key, now, window):
+        with self._lock:
+            events = self._trimmed(key, now, window)
+            return events[0] if events else None
+
+    def add(self, key, now, window):
+        with self._lock:
+            events = self._trimmed(key, now, window)
+            if events is None:
+                events = self._events[key] = deque()
+            events.append(now)
+
+    def add_if_below(self, key, now, window, limit):
+        """Record an event unless key already has limit events in the window. Returns (added, oldest)."""
+        with self._lock:
+            events = self._trimmed(key, now, window)
+            if events and len(events) >= limit:
+                return False, events[0]
+            if events is None:
+                events = self._events[key] = deque()
+            events.append(now)
+            return True, events[0]
+
+    def discard_one(self, key):
+        with self._lock:
+            events = self._events.get(key)
+            if events:
+                events.pop()
+
+    def clear(self, key):
+        with self._lock:
+            self._events.pop(key, None)
+
+
+class SlidingWindowLimiter:
+    def __init__(self, name, limit, window, store):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.store = store
+
+    def set_store(self, store):
+        self.store = store
+
+    def retry_after(self, key):
+        """Seconds until key may try again, or 0 if it is under the limit."""
+        now = time.time()
+        if self.store.count(key, now, self.window) < self.limit:
+            metrics.incr(f"login_limiter.{self.name}.allowed")
+            return 0
+        metrics.incr(f"login_limiter.{self.name}.blocked")
+        oldest = self.store.oldest(key, now, self.window) or now
+        return max(1, int(oldest + self.window - now) + 1)
+
+    def acquire(self, key):
+        """
+        Check and record an attempt in one step. Returns 0 when the attempt was
+        recorded, otherwise the seconds until key may try again.
+        """
+        now = time.time()
+        added, oldest = self.store.add_if_below(key, now, self.window, self.limit)
+        if added:
+            metrics.incr(f"login_limiter.{self.name}.allowed")
+            return 0
+        metrics.incr(f"login_limiter.{self.name}.blocked")
+        return max(1, int(oldest + self.window - now) + 1)
+
+    def release(self, key):
+        """Give back one slot taken by acquire, e.g. for an attempt that should not count."""
+        self.store.discard_one(key)
+
+    def hit(self, key):
+        self.store.add(key, time.time(), self.window)
+
+    def reset(self, key):
+        self.store.clear(key)
+
+
+ip_limiter = SlidingWindowLimiter(
+    "ip", settings.LOGIN_IP_LIMIT, settings.LOGIN_IP_WINDOW, MemoryWindowStore(settings.LOGIN_LIMITER_SIZE)
+)
+email_limiter = SlidingWindowLimiter(
+    "email", settings.LOGIN_EMAIL_LIMIT, settings.LOGIN_EMAIL_WINDOW, MemoryWindowStore(settings.LOGIN_LIMITER_SIZE)
+)
+unknown_email_cache = Cache(
+    "login_unknown_email", MemoryBackend(settings.LOGIN_LIMITER_SIZE, settings.LOGIN_UNKNOWN_EMAIL_TTL)
+)
+
+
+def normalize_email(email):
+    return (email or "").strip().lower()
+
+
+def forget_unknown_email(email):
+    """Call when an account is created for (or renamed to) email."""
+    unknown_email_cache.delete(normalize_email(email))
@@ -0,0 +1,90 @@
+"""
+Password hashing off the request path.
+
+bcrypt costs a few hundred milliseconds of CPU per call. Hashing and
+verification run on a dedicated thread pool (the bcrypt backend releases the GIL)
+of PASSWORD_HASH_WORKERS threads, with at most PASSWORD_HASH_MAX_PENDING calls
+queued; beyond that callers get a 503 instead of piling up. Queue wait and run
+time are recorded as passwords.queue_wait and passwords.<operation>.
+
+BCRYPT_ROUNDS is both the minimum and maximum accepted cost, so after changing it
+every stored hash is upgraded the next time its user logs in.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from backend import metrics
+from backend.config import TenantSettings
+
+settings = TenantSettings()
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="passwords")
+_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def _set_pending(delta):
+    global _pending
+    with _pending_lock:
+        _pending += delta
+        metrics.set_gauge("passwords.queue_depth", _pending)
+
+
+def _measured(operation, fn, *args):
+    queued_at = time.perf_counter()
+
+    def task():
+        started = time.perf_counter()
+        metrics.observe("passwords.queue_wait", started - queued_at)
+        try:
+            return fn(*args)
+        finally:
+            metrics.observe(f"passwords.{operation}", time.perf_counter() - started)
+
+    return task
+
+
+def _release(future):
+    # runs for finished and cancelled calls alike
+    _set_pending(-1)
+    _slots.release()
+
+
+async def _run(operation, fn, *args):
+    if not _slots.acquire(blocking=False):
+        metrics.incr("passwords.rejected")
+        raise HTTPException(status_code=503, detail="Too many login attempts in progress, try again shortly")
+    _set_pending(1)
+    try:
+        future = executor.submit(_measured(operation, fn, *args))
+    except Exception:
+        _set_pending(-1)
+        _slots.release()
+        raise
+    future.add_done_callback(_release)
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password(password: str) -> str:
+    return await _run("hash", pwd_context.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run("verify", pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update(plain_password: str, hashed_password: str):
+    """(valid, new_hash); new_hash is set when the stored hash uses an outdated cost or scheme."""
+    return await _run("verify", pwd_context.verify_and_update, plain_password, hashed_password)
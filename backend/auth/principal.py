@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from backend.auth.jwt_handler import verify_token
+from backend.cache import Cache, MemoryBackend
+from backend.db.db import SessionLocal
+from backend.schemas.RoleSchema import RoleEnum
+from backend.User.UserModel import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, built once per request from the verified token."""
+
+    user_id: str
+    role: RoleEnum
+    business_id: Optional[str] = None
+    email: Optional[str] = None
+
+
+# business_id for tokens issued before it was added to the claims
+business_id_cache = Cache("principal_business_id", MemoryBackend(4096, 3600))
+
+
+def _load_business_id(user_id):
+    db = SessionLocal()
+    try:
+        user = db.query(User.business_id).filter(User.user_id == user_id).first()
+        return user.business_id if user else None
+    finally:
+        db.close()
+
+
+async def get_principal(claims: dict = Depends(verify_token)) -> Principal:
+    user_id = claims.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    try:
+        role = RoleEnum(claims.get("role"))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=403, detail="Invalid user role provided in token.")
+
+    business_id = claims.get("business_id")
+    if business_id is None:
+        cached = business_id_cache.get(user_id)
+        if cached is None:
+            # "" marks a user without a business so it is not looked up again
+            cached = await run_in_threadpool(_load_business_id, user_id) or ""
+            business_id_cache.set(user_id, cached)
+        business_id = cached or None
+
+    return Principal(user_id=user_id, role=role, business_id=business_id, email=claims.get("sub"))
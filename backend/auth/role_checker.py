@@ -1,37 +1,39 @@
+import inspect
 from functools import wraps
 from typing import Callable, Any
 from fastapi import HTTPException, Depends
-from backend.auth.jwt_handler import verify_token
 from backend.schemas.RoleSchema import RoleEnum
 
 
-def check_role(allowed_roles: list[RoleEnum]):
-    def decorator(func: Callable):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            token_data = kwargs.get("token")
-            if not token_data:
-                raise HTTPException(status_code=401, detail="Missing token data")
+def authorize_role(principal, allowed_roles):
+    if not principal:
+        raise HTTPException(status_code=401, detail="Missing token data")
 
-            role_str = token_data.get("role")
-            try:
-                user_role = RoleEnum(role_str)
-            except (ValueError, KeyError):
-                raise HTTPException(
-                    status_code=403, detail="Invalid user role provided in token."
-                )
+    if principal.role not in allowed_roles:
+        raise HTTPException(
+            status_code=403,
+            detail="You don't have permission to perform this action",
+        )
 
-            if user_role not in allowed_roles:
-                raise HTTPException(
-                    status_code=403,
-                    detail="You don't have permission to perform this action",
-                )
 
-            # Handle both async and sync functions
-            result = func(*args, **kwargs)
-            if hasattr(result, "_await_"):  # Check if it's a coroutine
-                return await result
-            return result
+def check_role(allowed_roles: list[RoleEnum]):
+    """
+    Reject the request unless the caller's role is in allowed_roles. The handler
+    must take a `principal: Principal = Depends(get_principal)` argument. The wrapper
+    keeps the handler's kind: async handlers stay on the event loop and sync
+    handlers stay sync, so FastAPI still runs them in its threadpool.
+    """
+    def decorator(func: Callable):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                authorize_role(kwargs.get("principal"), allowed_roles)
+                return await func(*args, **kwargs)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                authorize_role(kwargs.get("principal"), allowed_roles)
+                return func(*args, **kwargs)
 
         return wrapper
 
@@ -0,0 +1,89 @@
+"""
+Concurrent load against running API endpoints, reporting latency percentiles.
+
+Run it against a build before and after a change to compare p99, e.g. with 500
+concurrent clients on the async read routes:
+
+    python -m backend.benchmarks.load_test --base-url http://localhost:8000 \
+        --token "$TOKEN" --clients 500 --requests 20 \
+        --path "/get-recordings?timeline=Last 30 days" \
+        --path "/recordings-insights?timeline=Last 30 days" \
+        --path "/list-feedbacks?timeline=Last 30 days"
+
+Each client is a thread with its own keep-alive connection issuing --requests
+requests round-robin over the paths after all clients are ready.
+"""
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_client(base_url, headers, paths, count, start, offset):
+    session = requests.Session()
+    latencies = {path: [] for path in paths}
+    errors = 0
+    start.wait()
+    for i in range(count):
+        path = paths[(offset + i) % len(paths)]
+        began = time.perf_counter()
+        try:
+            response = session.get(base_url + path, headers=headers, timeout=120)
+            if response.status_code >= 500:
+                errors += 1
+        except requests.RequestException:
+            errors += 1
+        latencies[path].append(time.perf_counter() - began)
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="Bearer token used for every request")
+    parser.add_argument("--path", action="append", required=True, dest="paths")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"}
+    start = threading.Barrier(args.clients + 1)
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        futures = [
+            pool.submit(run_client, args.base_url, headers, args.paths, args.requests, start, offset)
+            for offset in range(args.clients)
+        ]
+        start.wait()
+        began = time.perf_counter()
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - began
+
+    errors = sum(result[1] for result in results)
+    total = args.clients * args.requests
+    print(f"{total} requests from {args.clients} clients in {elapsed:.1f}s "
+          f"({total / elapsed:.0f} req/s, {errors} errors)")
+    print(f"{'path':<50} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    for path in args.paths:
+        samples = [s for latencies, _ in results for s in latencies[path]]
+        print(
+            f"{path[:50]:<50} "
+            f"{percentile(samples, 50) * 1000:>9.1f} "
+            f"{percentile(samples, 95) * 1000:>9.1f} "
+            f"{percentile(samples, 99) * 1000:>9.1f} "
+            f"{statistics.fmean(samples) * 1000 if samples else 0:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Check that handlers decorated with check_role are not serialized on the event loop.
+
+Builds a throwaway app with a blocking sync handler and an async handler, both
+behind check_role, fires concurrent requests straight at the ASGI app and fails
+if the blocking calls ran one after another:
+
+    python -m backend.benchmarks.role_checker_concurrency --requests 8 --delay 0.5
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from fastapi import Depends, FastAPI
+
+from backend.auth.principal import Principal, get_principal
+from backend.auth.role_checker import check_role
+from backend.schemas.RoleSchema import RoleEnum
+
+
+def build_app(delay):
+    app = FastAPI()
+
+    @app.get("/sync")
+    @check_role([RoleEnum.L4])
+    def blocking(principal: Principal = Depends(get_principal)):
+        time.sleep(delay)
+        return {"ok": True}
+
+    @app.get("/async")
+    @check_role([RoleEnum.L4])
+    async def non_blocking(principal: Principal = Depends(get_principal)):
+        await asyncio.sleep(delay)
+        return {"ok": True}
+
+    @app.get("/forbidden")
+    @check_role([RoleEnum.L1])
+    def forbidden(principal: Principal = Depends(get_principal)):
+        return {"ok": True}
+
+    app.dependency_overrides[get_principal] = lambda: Principal("bench", RoleEnum.L4, "bench")
+    return app
+
+
+async def call(app, path):
+    """Minimal ASGI GET; returns the response status."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    status = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app(scope, receive, send)
+    return status.get("code")
+
+
+async def timed_batch(app, path, count):
+    began = time.perf_counter()
+    statuses = await asyncio.gather(*(call(app, path) for _ in range(count)))
+    return time.perf_counter() - began, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+
+    app = build_app(args.delay)
+    serialized = args.requests * args.delay
+    failed = False
+
+    for path in ("/sync", "/async"):
+        elapsed, statuses = asyncio.run(timed_batch(app, path, args.requests))
+        concurrent = elapsed < serialized / 2 and all(code == 200 for code in statuses)
+        failed |= not concurrent
+        print(f"{path:<8} {args.requests} requests in {elapsed:.2f}s "
+              f"(serialized would take {serialized:.2f}s): {'ok' if concurrent else 'SERIALIZED'}")
+
+    status = asyncio.run(call(app, "/forbidden"))
+    failed |= status != 403
+    print(f"/forbidden returned {status}: {'ok' if status == 403 else 'expected 403'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import threading
+from cachetools import TTLCache
+from backend import metrics
+
+
+class MemoryBackend:
+    """Process-local LRU store where every entry also expires after ttl seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self._data = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class Cache:
+    """
+    Named cache in front of a backend. Any object with get/set/delete/clear
+    (get returning None on a miss) can be plugged in, e.g. a shared store so
+    several workers see the same entries and invalidations.
+    """
+
+    def __init__(self, name, backend):
+        self.name = name
+        self.backend = backend
+
+    def set_backend(self, backend):
+        self.backend = backend
+
+    def get(self, key):
+        value = self.backend.get(key)
+        metrics.incr(f"cache.{self.name}.{'misses' if value is None else 'hits'}")
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def get_or_load(self, key, loader):
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            self.backend.set(key, value)
+        return value
+
+    def delete(self, key):
+        self.backend.delete(key)
+
+    def clear(self):
+        self.backend.clear()
+        metrics.incr(f"cache.{self.name}.invalidations")
+
+    def stats(self):
+        counters = metrics.snapshot()["counters"]
+        return {
+            kind: counters.get(f"cache.{self.name}.{kind}", 0)
+            for kind in ("hits", "misses", "invalidations")
+        }
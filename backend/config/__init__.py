@@ -27,6 +27,39 @@ class TenantSettings(BaseSettings):
     tz_NY: str
     BASE_UPLOAD_FOLDER: str
     GEMINI_API_KEY: str
+    SCOPE_CACHE_TTL: int = 300  # seconds a resolved downline scope is reused
+    SCOPE_CACHE_SIZE: int = 2048
+    TRANSCRIPTION_WORKERS: int = 2  # worker threads started with the API, 0 to disable
+    TRANSCRIPTION_POLL_INTERVAL: float = 2.0
+    TRANSCRIPTION_JOB_TIMEOUT: int = 3600  # in_progress jobs older than this are requeued
+    GEMINI_MAX_CONCURRENCY: int = 4  # Gemini calls in flight per process
+    GEMINI_REQUESTS_PER_MINUTE: int = 60
+    GEMINI_MAX_ATTEMPTS: int = 5
+    GEMINI_BACKOFF_BASE: float = 2.0
+    GEMINI_BACKOFF_MAX: float = 60.0
+    STORAGE_BACKEND: str = "s3"  # s3, local or memory
+    STORAGE_LOCAL_ROOT: str = ""  # local backend root, defaults to BASE_UPLOAD_FOLDER/storage
+    S3_MAX_POOL_CONNECTIONS: int = 50
+    WORD_CLOUD_CACHE_SIZE: int = 512
+    WORD_CLOUD_CACHE_TTL: int = 86400
+    RENDER_WORKERS: int = 2  # processes rendering word clouds
+    RENDER_MAX_PENDING: int = 16
+    RENDER_TIMEOUT: float = 30.0
+    BCRYPT_ROUNDS: int = 12  # changing it rehashes passwords on their next login
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 256
+    LOGIN_IP_LIMIT: int = 30  # login attempts per IP per window
+    LOGIN_IP_WINDOW: int = 60
+    LOGIN_EMAIL_LIMIT: int = 5  # failed logins per email per window
+    LOGIN_EMAIL_WINDOW: int = 300
+    LOGIN_UNKNOWN_EMAIL_TTL: int = 300
+    LOGIN_LIMITER_SIZE: int = 10000
+    UPLOAD_STREAMING: bool = True  # stream uploads to S3 instead of copying them to disk first
+    S3_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024  # bytes, S3 minimum is 5 MB
+    S3_MULTIPART_CONCURRENCY: int = 4
+    UPLOAD_SPOOL_RETENTION: int = 86400  # seconds an unclaimed spool file is kept
+    FEEDBACK_RECENT_CACHE_TTL: int = 600  # seconds a submitted contact number short-circuits the dedupe query
+    FEEDBACK_RECENT_CACHE_SIZE: int = 10000
     class Config:
         env_file = get_env_file()
         env_file_encoding = "utf-8"
@@ -2,6 +2,7 @@ import logging
 
 from sqlalchemy import create_engine, Engine
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
@@ -13,6 +14,17 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 engine = create_engine(DATABASE_URL, pool_size=10, max_overflow=20, pool_recycle=300, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Same database through aiomysql for async routes; ASYNC_DATABASE_URL overrides the derived URL
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or DATABASE_URL.replace(
+    "mysql+pymysql://", "mysql+aiomysql://", 1
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, pool_size=20, max_overflow=40, pool_recycle=300, pool_pre_ping=True
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 def get_session():
     db = SessionLocal()
@@ -20,3 +32,8 @@ def get_session():
         yield db
     finally:
         db.close()
+
+
+async def get_async_session():
+    async with AsyncSessionLocal() as db:
+        yield db
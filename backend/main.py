@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import JSONResponse
 from backend.Business.api import router as business_router
@@ -11,6 +11,13 @@ from backend.Feedback.api import router as feedback_router
 from backend.Dashboard.api import router as dashboard_router
 from backend.Area.api import router as area_router
 from backend.Transcription.api import router as transcription_router
+from backend.Export.api import router as export_router
+from backend import metrics
+from backend.auth.principal import Principal, get_principal
+from backend.auth.role_checker import check_role
+from backend.schemas.RoleSchema import RoleEnum
+from backend.Transcription.worker import worker_pool
+from backend.Transcription import wordclouds
 
 
 app = FastAPI(
@@ -25,6 +32,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # browsers only let clients read response headers that are listed here
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -38,9 +47,32 @@ app.include_router(feedback_router)
 app.include_router(dashboard_router)
 app.include_router(area_router)
 app.include_router(transcription_router)
+app.include_router(export_router)
+
+
+@app.on_event("startup")
+def start_transcription_workers():
+    worker_pool.start()
+
+
+@app.on_event("shutdown")
+def stop_transcription_workers():
+    worker_pool.stop(timeout=5)
+
+
+@app.on_event("shutdown")
+def stop_render_pool():
+    wordclouds.shutdown()
 
 
 # Simple route for basic testing and healthcheck
 @app.get("/")
 def hello_world():
     return "Hello, World!"
+
+
+# Process-local counters and timings (cache hit rates, client latencies), L4 only
+@app.get("/metrics")
+@check_role([RoleEnum.L4])
+def get_metrics(principal: Principal = Depends(get_principal)):
+    return metrics.snapshot()
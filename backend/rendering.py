@@ -0,0 +1,107 @@
+"""
+CPU-bound image rendering off the request threads.
+
+Rendering runs in a small ProcessPoolExecutor so it neither holds the GIL of the
+API process nor competes with its threads. At most RENDER_MAX_PENDING jobs may
+be queued or running; further submissions fail fast with RenderBusy. The number
+of outstanding jobs is published as the render.queue_depth gauge.
+
+Render functions must live in this module (or another light one) because the
+workers are spawned and import them by name.
+"""
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw, ImageFont
+from wordcloud import WordCloud
+from backend import metrics
+
+
+class RenderBusy(Exception):
+    pass
+
+
+def _png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_placeholder(text, width=800, height=400):
+    """Plain white PNG with text centred on it."""
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    draw.text((width / 2, height / 2), text, fill="black", font=ImageFont.load_default(size=32), anchor="mm")
+    return _png(image)
+
+
+def render_word_cloud(frequencies):
+    """Render a keyword-frequency histogram straight to PNG bytes; an empty one gives the "No data available" image."""
+    if not frequencies:
+        return render_placeholder("No data available")
+    image = WordCloud(
+        width=800,
+        height=400,
+        background_color='white',
+        max_words=100,
+        contour_width=3,
+        contour_color='steelblue'
+    ).generate_from_frequencies(frequencies).to_image()
+    return _png(image)
+
+
+class RenderService:
+    def __init__(self, max_workers, max_pending, timeout):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the API process has threads and open connections
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _set_pending(self, delta):
+        with self._lock:
+            self._pending += delta
+            metrics.set_gauge("render.queue_depth", self._pending)
+
+    def _done(self, future):
+        self._slots.release()
+        self._set_pending(-1)
+
+    def submit(self, fn, *args):
+        """Queue fn(*args) on the pool and return its future."""
+        if not self._slots.acquire(blocking=False):
+            metrics.incr("render.rejected")
+            raise RenderBusy("Render queue is full")
+        self._set_pending(1)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def render(self, fn, *args):
+        """Run fn(*args) on the pool and wait up to `timeout` seconds for the result."""
+        future = self.submit(fn, *args)
+        with metrics.timed(f"render.{fn.__name__}"):
+            return future.result(timeout=self.timeout)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,4 +1,7 @@
 import enum
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
 
 class TransctriptionStatus(enum.IntEnum):
     failure = -1
@@ -7,4 +10,20 @@ class TransctriptionStatus(enum.IntEnum):
     completed = 2
 
 
+class TranscriptionJobResponse(BaseModel):
+    job_id: str
+    recording_id: str
+    status: TransctriptionStatus
+    attempts: int
+    error: Optional[str] = None
+    transcription_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
+
+class RecordingTranscriptionResponse(BaseModel):
+    recording_id: str
+    transcription_status: TransctriptionStatus
+    transcription_id: Optional[str] = None
+    transcription_text: Optional[str] = None
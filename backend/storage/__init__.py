@@ -0,0 +1,199 @@
+"""
+Object storage shared by the whole process.
+
+One S3 client is created lazily and reused by every thread (boto3 clients are
+thread-safe) with a connection pool sized by S3_MAX_POOL_CONNECTIONS. The
+backend is chosen by STORAGE_BACKEND: "s3", or "local" / "memory" stand-ins
+for development and tests; storage.set_backend swaps it at runtime.
+"""
+import io
+import os
+import shutil
+import threading
+import time
+import boto3
+from botocore.client import Config
+from botocore.exceptions import ClientError
+from backend import metrics
+from backend.config import TenantSettings
+
+settings = TenantSettings()
+
+
+class S3Backend:
+    def __init__(self, bucket, cdn, endpoint_url, access_key, secret_key, max_pool_connections):
+        self.bucket = bucket
+        self.cdn = cdn
+        self.endpoint_url = endpoint_url
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.max_pool_connections = max_pool_connections
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = boto3.client(
+                        "s3",
+                        endpoint_url=self.endpoint_url,
+                        aws_access_key_id=self.access_key,
+                        aws_secret_access_key=self.secret_key,
+                        config=Config(
+                            signature_version="s3v4",
+                            region_name="auto",
+                            max_pool_connections=self.max_pool_connections,
+                            retries={"max_attempts": 3, "mode": "standard"},
+                            tcp_keepalive=True,
+                        ),
+                    )
+        return self._client
+
+    def upload_fileobj(self, fileobj, key, content_type, transfer_config=None):
+        kwargs = {"ExtraArgs": {"ContentType": content_type}}
+        if transfer_config is not None:
+            kwargs["Config"] = transfer_config
+        self.client.upload_fileobj(fileobj, self.bucket, key, **kwargs)
+
+    def get(self, key):
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+        return response["Body"].read()
+
+    def head(self, key):
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404", "NotFound"):
+                return None
+            raise
+        return {"size": response["ContentLength"], "content_type": response.get("ContentType")}
+
+    def url(self, key):
+        return f"{self.cdn}/{key}"
+
+
+class LocalBackend:
+    """Stores objects as files under root; urls are file:// paths."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def upload_fileobj(self, fileobj, key, content_type, transfer_config=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as target:
+            shutil.copyfileobj(fileobj, target)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as source:
+                return source.read()
+        except FileNotFoundError:
+            return None
+
+    def head(self, key):
+        try:
+            return {"size": os.path.getsize(self._path(key)), "content_type": None}
+        except FileNotFoundError:
+            return None
+
+    def url(self, key):
+        return "file://" + os.path.abspath(self._path(key))
+
+
+class MemoryBackend:
+    """Keeps objects in a dict; for tests."""
+
+    def __init__(self, base_url="memory://"):
+        self.base_url = base_url
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def upload_fileobj(self, fileobj, key, content_type, transfer_config=None):
+        data = fileobj.read()
+        with self._lock:
+            self.objects[key] = (data, content_type)
+
+    def get(self, key):
+        with self._lock:
+            stored = self.objects.get(key)
+        return stored[0] if stored else None
+
+    def head(self, key):
+        with self._lock:
+            stored = self.objects.get(key)
+        return {"size": len(stored[0]), "content_type": stored[1]} if stored else None
+
+    def url(self, key):
+        return f"{self.base_url}{key}"
+
+
+class Storage:
+    """Backend plus per-operation timings and failure counters under storage.*."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def set_backend(self, backend):
+        self.backend = backend
+
+    def _timed(self, operation, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        except Exception:
+            metrics.incr(f"storage.{operation}.failure")
+            raise
+        finally:
+            metrics.observe(f"storage.{operation}", time.perf_counter() - started)
+
+    def upload_fileobj(self, fileobj, key, content_type, transfer_config=None):
+        """Upload a file-like object and return its public url."""
+        self._timed("upload", self.backend.upload_fileobj, fileobj, key, content_type, transfer_config)
+        return self.backend.url(key)
+
+    def upload_bytes(self, data, key, content_type):
+        metrics.incr("storage.upload.bytes", len(data))
+        return self.upload_fileobj(io.BytesIO(data), key, content_type)
+
+    def get(self, key):
+        """Object contents, or None if the key does not exist."""
+        return self._timed("get", self.backend.get, key)
+
+    def head(self, key):
+        """{"size", "content_type"} for the key, or None if it does not exist."""
+        return self._timed("head", self.backend.head, key)
+
+    def url(self, key):
+        return self.backend.url(key)
+
+
+def make_backend(name=None):
+    name = (name or settings.STORAGE_BACKEND).lower()
+    if name == "s3":
+        return S3Backend(
+            settings.S3_BUCKET_NAME,
+            settings.S3_CDN,
+            settings.S3_ENDPOINT,
+            settings.S3_ACCESS_KEY,
+            settings.S3_SECRET_KEY,
+            settings.S3_MAX_POOL_CONNECTIONS,
+        )
+    if name == "local":
+        return LocalBackend(settings.STORAGE_LOCAL_ROOT or os.path.join(settings.BASE_UPLOAD_FOLDER, "storage"))
+    if name == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unknown STORAGE_BACKEND {name!r}")
+
+
+storage = Storage(make_backend())